@@ -1,19 +1,7 @@
 import sys
 import os
-from PyPDF2 import PdfReader
 from src.entity_extractor import extract_experience_years
-
-# Function to directly extract text from PDF
-def extract_text_from_pdf(file_path):
-    try:
-        reader = PdfReader(file_path)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-        return text
-    except Exception as e:
-        print(f"Error extracting PDF text: {e}")
-        return ""
+from src.resume_processor import extract_text_from_pdf
 
 # Get resume path from command line
 if len(sys.argv) > 1:
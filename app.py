@@ -1,6 +1,11 @@
+import ipaddress
+import json
 import os
+import shutil
 import sys
-from flask import Flask, render_template, request, flash, redirect, url_for
+from tempfile import SpooledTemporaryFile
+from flask import (Flask, Request, Response, abort, jsonify, render_template, request, flash,
+                   redirect, stream_with_context, url_for)
 from werkzeug.utils import secure_filename
 
 # Add the project root directory to Python path to find the src module
@@ -11,24 +16,94 @@ sys.path.insert(0, os.path.dirname(PROJECT_ROOT))  # Add the parent directory
 sys.path.insert(0, PROJECT_ROOT)
 
 # Simple direct imports
+from src.config import Config
+from src.embedding_cache import cache_from_config
+from src.embedding_service import batcher_from_config
+from src.entity_extractor import configure_ner_from_config
 from src.resume_processor import extract_text, clean_text
-from src.nlp_matcher import match_resumes_to_jobs
-from src.candidate_ranker import rank_candidates
+from src.nlp_matcher import MODEL_NAME, encode_texts, set_embedding_batcher, set_embedding_cache
+from src.candidate_ranker import minimum_score_from_config
+from src.screening import iter_screen_many, screen
+from src.job_queue import QueueFull, ScreeningQueue
 
 # Define allowed extensions here to avoid circular imports
 ALLOWED_EXTENSIONS = {".pdf", ".docx", ".txt"}
 
+class SpooledRequest(Request):
+    """Request whose uploaded files stay in memory up to uploads.spool_max_kb;
+    larger ones spill to an anonymous temporary file, so concurrent uploads
+    never share a path."""
+
+    spool_max_bytes = 1024 * 1024
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None,
+                         content_length=None):
+        return SpooledTemporaryFile(max_size=self.spool_max_bytes, mode="rb+")
+
 app = Flask(__name__,
            template_folder=os.path.join(PROJECT_ROOT, "templates"),
            static_folder=os.path.join(PROJECT_ROOT, "static"))
 
 app.secret_key = "dev-secret-key-123"  # For development only
-UPLOAD_FOLDER = os.path.join(PROJECT_ROOT, "uploads")
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+app.request_class = SpooledRequest
+
+config = Config(os.path.join(PROJECT_ROOT, "config.yml"))
+SpooledRequest.spool_max_bytes = int(config.get("uploads.spool_max_kb", 1024)) * 1024
+set_embedding_cache(cache_from_config(config, MODEL_NAME, base_dir=PROJECT_ROOT))
+# Concurrent requests and queue workers share batched model calls
+set_embedding_batcher(batcher_from_config(config, encode_texts))
+configure_ner_from_config(config)
+
+# Validated once at startup, so a bad minimum_score fails fast
+MIN_SCORE = minimum_score_from_config(config)
+
+# Background screening for large uploads (see src/job_queue.py)
+screening_queue = None
+if config.get("job_queue.enabled", False):
+    screening_queue = ScreeningQueue(
+        workers=config.get("job_queue.workers", 2),
+        max_pending=config.get("job_queue.max_pending", 8),
+        keep_finished=config.get("job_queue.keep_finished", 100),
+        min_score=MIN_SCORE,
+    )
+PAGE_SIZE = config.get("job_queue.page_size", 50)
+QUEUED_SPOOL_BYTES = int(config.get("job_queue.spool_max_kb", 64)) * 1024
+REST_API_ENABLED = bool(config.get("api.enable_rest_api", False))
 
 def allowed_file(filename):
     return '.' in filename and '.' + filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def detach_uploads(files):
+    """Copy allowed uploads into spooled files that outlive the request,
+    for the background workers; returns [(filename, stream)].
+
+    Queued jobs may wait a while, so only small files (job_queue.spool_max_kb)
+    stay in memory; the rest go to anonymous temporary files.
+    """
+    uploads = []
+    for file in files:
+        if file and allowed_file(file.filename):
+            spool = SpooledTemporaryFile(max_size=QUEUED_SPOOL_BYTES, mode="w+b")
+            shutil.copyfileobj(file.stream, spool)
+            spool.seek(0)
+            uploads.append((secure_filename(file.filename), spool))
+    return uploads
+
+def submit_screening(files, job_description):
+    """Queue uploads as a background job; returns the job or None (after
+    flashing why) when nothing could be queued."""
+    uploads = detach_uploads(files)
+    if not uploads:
+        flash('No valid resumes were processed')
+        return None
+    try:
+        return screening_queue.submit(uploads, job_description)
+    except QueueFull:
+        for _, stream in uploads:
+            stream.close()
+        flash('The screening queue is full, please try again shortly')
+        return None
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
@@ -47,52 +122,270 @@ def index():
             flash('No selected files')
             return redirect(request.url)
 
-        resumes_text = {}
+        if screening_queue is not None:
+            job = submit_screening(files, job_description)
+            if job is None:
+                return redirect(request.url)
+            return redirect(url_for('job_view', job_id=job.id))
+
+        resume_objects = []
         for file in files:
             if file and allowed_file(file.filename):
                 filename = secure_filename(file.filename)
-                filepath = os.path.join(UPLOAD_FOLDER, filename)
-                file.save(filepath)
-                
+                # Parse straight from the (spooled) upload stream
                 try:
-                    text = extract_text(filepath)
-                    cleaned_text = clean_text(text)
-                    resumes_text[filename] = cleaned_text
+                    text = extract_text(file.stream, filename=filename)
+                    resume_objects.append({"text": clean_text(text), "filename": filename})
                 except Exception as e:
                     flash(f'Error processing {filename}: {str(e)}')
                     continue
-                finally:
-                    # Clean up uploaded file
-                    if os.path.exists(filepath):
-                        os.remove(filepath)
 
-        if not resumes_text:
+        if not resume_objects:
             flash('No valid resumes were processed')
             return redirect(request.url)
 
-        # Process resumes
-        # Create resume objects with text and filename
-        resume_objects = [{"text": text, "filename": fname} for fname, text in resumes_text.items()]
-        
-        # Get match scores with similarity values
-        match_scores = match_resumes_to_jobs(resume_objects, job_description)
-        
-        # Add similarity scores to resume objects for ranking
-        for resume_obj in resume_objects:
-            for score_obj in match_scores:
-                if score_obj.get("text") == resume_obj.get("text"):
-                    resume_obj["similarity"] = score_obj.get("similarity", 60.0)
-        
-        # Rank candidates
-        rankings = rank_candidates(resume_objects, job_description)
+        # Match and rank in one pass; results carry each resume's id
+        rankings = screen(resume_objects, job_description,
+                          min_score=MIN_SCORE)
 
         return render_template('results.html', results=rankings, job_desc=job_description)
 
     return render_template('index.html')
 
+def _job_or_404(job_id):
+    job = screening_queue.get(job_id) if screening_queue is not None else None
+    if job is None:
+        abort(404)
+    return job
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """Queue a screening job (same form fields as /); replies 202 with its id."""
+    if screening_queue is None:
+        abort(404)
+    job_description = request.form.get('job_description', '').strip()
+    files = request.files.getlist('resumes')
+    if not job_description or not files:
+        return jsonify(error="job_description and resumes are required"), 400
+    uploads = detach_uploads(files)
+    if not uploads:
+        return jsonify(error="no resumes with an allowed extension"), 400
+    try:
+        job = screening_queue.submit(uploads, job_description)
+    except QueueFull:
+        for _, stream in uploads:
+            stream.close()
+        response = jsonify(error="screening queue is full")
+        response.headers["Retry-After"] = "5"
+        return response, 429
+    return jsonify(job_id=job.id,
+                   status_url=url_for('job_status', job_id=job.id),
+                   results_url=url_for('job_results', job_id=job.id)), 202
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Status and per-stage progress of a queued job."""
+    return jsonify(_job_or_404(job_id).to_dict())
+
+@app.route('/jobs/<job_id>/results')
+def job_results(job_id):
+    """One page of a finished job's ranked results (?offset=&limit=)."""
+    job = _job_or_404(job_id)
+    if job.status != "done":
+        return jsonify(error=f"job is {job.status}", status=job.status), 409
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', PAGE_SIZE, type=int), 1), 500)
+    page = screening_queue.results_page(job_id, offset, limit)
+    next_offset = offset + limit if offset + limit < len(job.results) else None
+    return jsonify(results=page, offset=offset, limit=limit,
+                   total=len(job.results), next_offset=next_offset)
+
+@app.route('/jobs/<job_id>/view')
+def job_view(job_id):
+    """HTML progress page that refreshes until the job finishes, then
+    shows its results a page at a time."""
+    job = _job_or_404(job_id)
+    if job.status != "done":
+        return render_template('job_status.html', job=job)
+    page = max(request.args.get('page', 1, type=int), 1)
+    offset = (page - 1) * PAGE_SIZE
+    return render_template('results.html',
+                           results=screening_queue.results_page(job_id, offset, PAGE_SIZE),
+                           job_desc=job.job_description, offset=offset,
+                           prev_url=url_for('job_view', job_id=job_id, page=page - 1) if page > 1 else None,
+                           next_url=url_for('job_view', job_id=job_id, page=page + 1)
+                           if offset + PAGE_SIZE < len(job.results) else None)
+
+class BadRequest(ValueError):
+    """Invalid screening API input; the message is returned to the client."""
+
+def _api_jobs(raw):
+    """Normalize jobs given as strings or {"id", "description"} objects."""
+    if isinstance(raw, str):
+        raw = [raw]
+    if not isinstance(raw, list) or not raw:
+        raise BadRequest("at least one job description is required")
+    jobs = []
+    for index, job in enumerate(raw):
+        if isinstance(job, str):
+            job = {"id": index, "description": job}
+        if (not isinstance(job, dict) or not isinstance(job.get("description"), str)
+                or not job["description"].strip()):
+            raise BadRequest(f"job {index} has no description")
+        jobs.append({"id": job.get("id", index), "description": job["description"].strip()})
+    return jobs
+
+def _api_resumes(raw):
+    """Normalize resumes given as strings or {"text", "filename", "id"} objects."""
+    if not isinstance(raw, list) or not raw:
+        raise BadRequest("at least one resume is required")
+    resumes = []
+    for index, resume in enumerate(raw):
+        if isinstance(resume, str):
+            resume = {"text": resume}
+        if not isinstance(resume, dict) or not isinstance(resume.get("text"), str):
+            raise BadRequest(f"resume {index} has no text")
+        resumes.append({"id": resume.get("id", index),
+                        "filename": resume.get("filename", f"resume_{index}"),
+                        "text": clean_text(resume["text"])})
+    return resumes
+
+def parse_screening_request():
+    """Read jobs, resumes and options from a JSON or multipart request.
+
+    JSON: {"jobs" | "job_descriptions": [...] or "job_description": "...",
+    "resumes": [...], "top_k": int, "min_score": float (0..100)}.
+    Multipart: repeated job_description fields and/or "jobs" files (PDF,
+    DOCX or TXT, like resumes),
+    "resumes" files parsed in memory, and top_k / min_score fields.
+    Returns (jobs, resumes, errors, top_k, min_score).
+    """
+    errors = []
+    if request.is_json:
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            raise BadRequest("request body must be a JSON object")
+        raw_jobs = body.get("jobs", body.get("job_descriptions", body.get("job_description")))
+        jobs = _api_jobs(raw_jobs)
+        resumes = _api_resumes(body.get("resumes"))
+        options = body
+    else:
+        raw_jobs = [text for text in request.form.getlist('job_description') if text.strip()]
+        for file in request.files.getlist('jobs'):
+            if file and allowed_file(file.filename):
+                filename = secure_filename(file.filename)
+                raw_jobs.append({"id": filename,
+                                 "description": extract_text(file.stream, filename=filename)})
+        jobs = _api_jobs(raw_jobs)
+        resumes = []
+        for file in request.files.getlist('resumes'):
+            if not (file and allowed_file(file.filename)):
+                continue
+            filename = secure_filename(file.filename)
+            try:
+                text = extract_text(file.stream, filename=filename)
+            except Exception as e:
+                errors.append({"filename": filename, "error": str(e) or type(e).__name__})
+                continue
+            resumes.append({"id": len(resumes), "filename": filename, "text": clean_text(text)})
+        if not resumes:
+            raise BadRequest("no resumes with an allowed extension were uploaded")
+        options = request.form
+    top_k = _top_k_option(options.get("top_k"))
+    min_score = _min_score_option(options.get("min_score"))
+    return jobs, resumes, errors, top_k, min_score
+
+def _top_k_option(value):
+    """top_k from JSON (an integer) or a form field (its digits); None if unset."""
+    if value in (None, ""):
+        return None
+    # bool is an int subclass, so True would otherwise pass as 1
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise BadRequest("top_k must be an integer of at least 1")
+    try:
+        top_k = int(value)
+    except ValueError:
+        raise BadRequest("top_k must be an integer of at least 1")
+    if top_k < 1:
+        raise BadRequest("top_k must be an integer of at least 1")
+    return top_k
+
+def _min_score_option(value):
+    """min_score (0..100) from JSON or a form field; the config default if unset."""
+    if value in (None, ""):
+        return MIN_SCORE
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise BadRequest("min_score must be a number between 0 and 100")
+    try:
+        min_score = float(value)
+    except ValueError:
+        raise BadRequest("min_score must be a number between 0 and 100")
+    if not 0.0 <= min_score <= 100.0:
+        raise BadRequest("min_score must be a number between 0 and 100")
+    return min_score
+
+def _parse_or_400():
+    if not REST_API_ENABLED:
+        abort(404)
+    try:
+        return parse_screening_request(), None
+    except BadRequest as e:
+        return None, (jsonify(error=str(e)), 400)
+
+@app.route('/api/screen', methods=['POST'])
+def api_screen():
+    """Screen resumes against one job description; replies with JSON."""
+    parsed, error = _parse_or_400()
+    if error:
+        return error
+    jobs, resumes, errors, top_k, min_score = parsed
+    if len(jobs) != 1:
+        return jsonify(error="use /api/screen/batch for several job descriptions"), 400
+    results = screen(resumes, jobs[0]["description"], top_k=top_k, min_score=min_score)
+    return jsonify(job_id=jobs[0]["id"], results=results, errors=errors)
+
+@app.route('/api/screen/batch', methods=['POST'])
+def api_screen_batch():
+    """Screen resumes against several job descriptions in one pass.
+
+    Every resume and job is embedded once (one similarity matrix); the
+    response is NDJSON with one {"type": "job"} line per job, written as
+    soon as that job is ranked, then a {"type": "summary"} line.
+    """
+    parsed, error = _parse_or_400()
+    if error:
+        return error
+    jobs, resumes, errors, top_k, min_score = parsed
+
+    def generate():
+        descriptions = [job["description"] for job in jobs]
+        for index, results in iter_screen_many(resumes, descriptions, top_k=top_k,
+                                               min_score=min_score):
+            yield json.dumps({"type": "job", "job_id": jobs[index]["id"],
+                              "results": results}) + "\n"
+        yield json.dumps({"type": "summary", "jobs": len(jobs), "resumes": len(resumes),
+                          "errors": errors}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+def _is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
 if __name__ == '__main__':
     print("Starting Resume Screening System...")
     print(f"Templates directory: {os.path.join(PROJECT_ROOT, 'templates')}")
     print(f"Static directory: {os.path.join(PROJECT_ROOT, 'static')}")
-    print("Server running at http://localhost:5000")
-    app.run(debug=True, port=5000)
+    host = config.get("api.host", "127.0.0.1")
+    port = config.get("api.port", 5000)
+    debug = bool(config.get("api.debug", False))
+    if debug and not _is_loopback(host):
+        # The Werkzeug debugger runs arbitrary code for whoever can reach it
+        print(f"Ignoring api.debug: {host} is not a loopback address")
+        debug = False
+    print(f"Server running at http://{host}:{port}")
+    app.run(debug=debug, host=host, port=port)
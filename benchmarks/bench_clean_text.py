@@ -0,0 +1,42 @@
+"""Benchmark clean_text against the previous three-pass implementation.
+
+Usage: python benchmarks/bench_clean_text.py [pages]
+"""
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.resume_processor import clean_text
+
+def legacy_clean_text(text: str) -> str:
+    text = re.sub(r"\r\n|\r|\n", " ", text)
+    text = re.sub(r"\s+", " ", text)
+    text = re.sub(r"[^\x09\x0A\x0D\x20-\x7E]", " ", text)
+    return text.strip()
+
+def synthetic_resume(pages: int, seed: int = 0) -> str:
+    """Multi-page text shaped like PDF extraction output: short lines,
+    bullets, tabs, ligatures and stray control characters."""
+    rng = random.Random(seed)
+    words = ["Python", "AWS", "led", "team", "of", "5", "engineers", "built", "ML",
+             "pipelines", "•", "–", "café", "ﬁnance", "\x0c", "\t"]
+    lines = []
+    for _ in range(pages * 60):
+        lines.append(" ".join(rng.choice(words) for _ in range(rng.randint(3, 12))))
+    return "\r\n".join(lines)
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    text = synthetic_resume(pages)
+    print(f"{pages} pages, {len(text):,} characters")
+    for name, fn in (("legacy", legacy_clean_text), ("clean_text", clean_text)):
+        runs = 20
+        best = min(timeit.repeat(lambda: fn(text), number=runs, repeat=5)) / runs
+        print(f"{name:>12}: {best * 1000:.2f} ms per document")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark screen() against the old match / text-merge / rank path of app.py.
+
+Embeddings are computed once up front and served from an in-memory cache
+during timing, so the numbers compare the matching and ranking overhead
+rather than model throughput.
+
+Usage: python benchmarks/bench_screen.py [resumes]
+"""
+import os
+import random
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.candidate_ranker import rank_candidates
+from src.embedding_cache import EmbeddingCache
+from src.nlp_matcher import MODEL_NAME, get_embeddings, match_resumes_to_jobs, set_embedding_cache
+from src.screening import screen
+
+JOB = ("Senior Python engineer with 5+ years of experience building data pipelines "
+       "on AWS with Docker, Kubernetes and SQL. Masters preferred.")
+
+def legacy_screen(resume_objects, job_description):
+    match_scores = match_resumes_to_jobs(resume_objects, job_description)
+    for resume_obj in resume_objects:
+        for score_obj in match_scores:
+            if score_obj.get("text") == resume_obj.get("text"):
+                resume_obj["similarity"] = score_obj.get("similarity", 60.0)
+    return rank_candidates(resume_objects, job_description)
+
+def synthetic_resumes(count: int, seed: int = 0):
+    """Upload-sized resumes (a few thousand characters each)."""
+    rng = random.Random(seed)
+    words = ["Python", "AWS", "Docker", "SQL", "led", "team", "built", "pipelines",
+             "years", "experience", "Kubernetes", "Excel", "Masters", "Bachelors"]
+    return [
+        {"filename": f"resume_{i}.pdf",
+         "text": f"Candidate {i}, {rng.randint(0, 15)} years of experience. "
+                 + " ".join(rng.choice(words) for _ in range(600))}
+        for i in range(count)
+    ]
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    resumes = synthetic_resumes(count)
+    with tempfile.TemporaryDirectory() as tmp:
+        set_embedding_cache(EmbeddingCache(tmp, MODEL_NAME, memory_items=count + 1))
+        get_embeddings([r["text"] for r in resumes] + [JOB])  # warm the cache
+        print(f"{count} resumes")
+        for name, fn in (("legacy", lambda: legacy_screen([dict(r) for r in resumes], JOB)),
+                         ("screen", lambda: screen([dict(r) for r in resumes], JOB))):
+            best = min(timeit.repeat(fn, number=1, repeat=5))
+            print(f"{name:>8}: {best * 1000:.1f} ms per request")
+
+if __name__ == "__main__":
+    main()
@@ -4,23 +4,27 @@ import sys
 # Add the src directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
 
+from src.config import Config
+from src.embedding_cache import cache_from_config
+from src.entity_extractor import configure_ner_from_config
+from src.extraction_cache import ExtractionManifest
 from src.resume_processor import load_resumes
-from src.nlp_matcher import match_resumes_to_jobs
-from src.candidate_ranker import rank_candidates
+from src.nlp_matcher import MODEL_NAME, set_embedding_cache
+from src.candidate_ranker import minimum_score_from_config
+from src.screening import screen_many
+from src.streaming import DEFAULT_STREAM_TOP_K, stream_directory_many
 
-def process_job(job_file, resumes):
-    """Process a single job file against a set of resumes."""
+def process_job(job_file, job_desc, ranked, min_score=None):
+    """Print the ranked candidates for a single job file."""
     print(f"\n{'='*50}")
     print(f"Job Description: {job_file}")
     print(f"{'='*50}")
     
-    with open(f"data/sample_jobs/{job_file}", "r", encoding="utf-8") as f:
-        job_desc = f.read()
-        # Print the first 150 characters of the job description
-        print(f"Excerpt: {job_desc[:150]}...\n")
+    # Print the first 150 characters of the job description
+    print(f"Excerpt: {job_desc[:150]}...\n")
 
-    match_results = match_resumes_to_jobs(resumes, job_desc)
-    ranked = rank_candidates(match_results, job_desc)
+    if not ranked and min_score is not None:
+        print(f"No candidates scored at least {min_score}%.")
 
     for i, cand in enumerate(ranked, 1):
         print(f"Rank {i}: {cand['filename']} - Final Score: {cand['final_score']}%")
@@ -32,15 +36,63 @@ def process_job(job_file, resumes):
         print(f"  Reason: {cand['reason']}\n")
 
 def main():
+    config = Config()
+    set_embedding_cache(cache_from_config(config, MODEL_NAME))
+    configure_ner_from_config(config)
+
     # Load all resumes once
-    resumes = load_resumes("data/sample_resumes")
-    
+    manifest = None
+    if config.get("extraction_cache.enabled", False):
+        manifest = ExtractionManifest(
+            config.get("extraction_cache.path"),
+            with_entities=config.get("extraction_cache.store_entities", False),
+        )
+
+    ingestion = dict(
+        workers=config.get("ingestion.workers", 1),
+        timeout=config.get("ingestion.timeout_seconds"),
+        manifest=manifest,
+        max_pages=config.get("ingestion.max_pages"),
+        max_chars=config.get("ingestion.max_chars"),
+    )
+
     # Get all job files
     job_files = [f for f in os.listdir("data/sample_jobs") if f.endswith(".txt")]
     
-    # Process each job file
+    job_descs = []
     for job_file in job_files:
-        process_job(job_file, resumes)
+        with open(f"data/sample_jobs/{job_file}", "r", encoding="utf-8") as f:
+            job_descs.append(f.read())
+
+    min_score = minimum_score_from_config(config)
+    top_k = config.get("top_k")
+    top_k = int(top_k) if top_k is not None else None
+
+    if config.get("ingestion.streaming", False):
+        # One pass over the directory, keeping a bounded top-K per job, so
+        # memory stays flat however many resumes there are
+        errors = []
+        all_rankings = stream_directory_many(
+            "data/sample_resumes", job_descs,
+            top_k=top_k if top_k is not None else DEFAULT_STREAM_TOP_K,
+            min_score=min_score, errors=errors, **ingestion)
+        for error in errors:
+            print(f"Skipped {error['filename']}: {error['error']}")
+        for job_file, job_desc, ranked in zip(job_files, job_descs, all_rankings):
+            process_job(job_file, job_desc, ranked, min_score=min_score)
+        return
+
+    errors = []
+    resumes = load_resumes("data/sample_resumes", errors=errors, **ingestion)
+    for error in errors:
+        print(f"Skipped {error['filename']}: {error['error']}")
+
+    # Extract entities and embed every resume and job once, then rank all jobs
+    all_rankings = screen_many(resumes, job_descs, top_k=top_k, min_score=min_score)
+
+    # Process each job file
+    for job_file, job_desc, ranked in zip(job_files, job_descs, all_rankings):
+        process_job(job_file, job_desc, ranked, min_score=min_score)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,9 +1,9 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import os
-from database import Database
+from src.database import Database
 
 class ResumeAnalytics:
     def __init__(self, db: Database):
@@ -18,18 +18,8 @@ class ResumeAnalytics:
     
     def plot_skill_distribution(self, save_path: str = None):
         """Plot the distribution of skills across all candidates."""
-        # Get all candidates and their skills
-        candidates = self.db.get_all_candidates()
-        all_skills = {}
-        
-        for candidate in candidates:
-            skills = json.loads(candidate['skills'])
-            for skill in skills:
-                all_skills[skill] = all_skills.get(skill, 0) + 1
-        
-        # Create DataFrame
-        df = pd.DataFrame(list(all_skills.items()), columns=['Skill', 'Count'])
-        df = df.sort_values('Count', ascending=False).head(20)
+        # Skill counts come straight from the normalized candidate_skills table
+        df = pd.DataFrame(self.db.skill_frequencies(limit=20), columns=['Skill', 'Count'])
         
         # Create plot
         plt.figure(figsize=(12, 6))
@@ -45,11 +35,12 @@ class ResumeAnalytics:
     
     def plot_score_distribution(self, job_id: int, save_path: str = None):
         """Plot the distribution of scores for a specific job."""
-        screenings = self.db.get_job_candidates(job_id)
-        scores = [s['total_score'] for s in screenings]
+        # Bins are counted in SQL; only one row per bin reaches Python
+        histogram = self.db.score_histogram(job_id, bins=20)
         
         plt.figure(figsize=(10, 6))
-        sns.histplot(scores, bins=20, kde=True)
+        plt.bar([lo for lo, _, _ in histogram], [count for _, _, count in histogram],
+                width=[hi - lo for lo, hi, _ in histogram], align='edge')
         plt.title(f'Score Distribution for Job #{job_id}')
         plt.xlabel('Score')
         plt.ylabel('Count')
@@ -60,15 +51,14 @@ class ResumeAnalytics:
         else:
             plt.show()
     
-    def plot_experience_vs_score(self, job_id: int, save_path: str = None):
-        """Plot relationship between experience and scores."""
-        candidates = self.db.get_job_candidates(job_id)
+    def plot_experience_vs_score(self, job_id: int, save_path: str = None,
+                                 max_points: int = 5000):
+        """Plot relationship between experience and scores.
         
-        data = {
-            'Experience': [c['experience_years'] for c in candidates],
-            'Score': [c['total_score'] for c in candidates]
-        }
-        df = pd.DataFrame(data)
+        Large jobs are randomly sampled down to ``max_points`` candidates.
+        """
+        df = pd.DataFrame(self.db.experience_score_samples(job_id, limit=max_points),
+                          columns=['Experience', 'Score'])
         
         plt.figure(figsize=(10, 6))
         sns.scatterplot(data=df, x='Experience', y='Score')
@@ -92,14 +82,16 @@ class ResumeAnalytics:
         
         # Get job details
         job = self.db.get_job(job_id)
-        candidates = self.db.get_job_candidates(job_id)
+        summary = self.db.score_summary(job_id, percentiles=(50, 90))
         
         # Create summary statistics
         stats = {
-            'total_candidates': len(candidates),
-            'average_score': sum(c['total_score'] for c in candidates) / len(candidates),
-            'average_experience': sum(c['experience_years'] for c in candidates) / len(candidates),
-            'top_skills': self._get_top_skills(candidates)
+            'total_candidates': summary['count'],
+            'average_score': summary['mean'] or 0.0,
+            'median_score': summary['percentiles'][50] or 0.0,
+            'p90_score': summary['percentiles'][90] or 0.0,
+            'average_experience': summary['mean_experience'] or 0.0,
+            'top_skills': self._get_top_skills(job_id)
         }
         
         # Generate HTML report
@@ -107,15 +99,9 @@ class ResumeAnalytics:
         with open(os.path.join(output_dir, f'report_job_{job_id}.html'), 'w') as f:
             f.write(report_html)
     
-    def _get_top_skills(self, candidates: List[Dict[str, Any]], top_n: int = 10):
-        """Get the most common skills among candidates."""
-        skill_count = {}
-        for candidate in candidates:
-            skills = json.loads(candidate['skills'])
-            for skill in skills:
-                skill_count[skill] = skill_count.get(skill, 0) + 1
-        
-        return sorted(skill_count.items(), key=lambda x: x[1], reverse=True)[:top_n]
+    def _get_top_skills(self, job_id: int, top_n: int = 10) -> List[Tuple[str, int]]:
+        """Get the most common skills among a job's candidates."""
+        return self.db.skill_frequencies(limit=top_n, job_id=job_id)
     
     def _generate_html_report(self, job: Dict[str, Any], stats: Dict[str, Any]) -> str:
         """Generate HTML report with embedded visualizations."""
@@ -143,6 +129,10 @@ class ResumeAnalytics:
                     <h3>Average Score</h3>
                     <p>{stats['average_score']:.2f}</p>
                 </div>
+                <div class="stat-card">
+                    <h3>Median / 90th Percentile Score</h3>
+                    <p>{stats['median_score']:.2f} / {stats['p90_score']:.2f}</p>
+                </div>
                 <div class="stat-card">
                     <h3>Average Experience</h3>
                     <p>{stats['average_experience']:.1f} years</p>
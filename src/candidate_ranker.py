@@ -1,10 +1,12 @@
-from typing import Dict, List, Optional
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Sequence, Union
+import numpy as np
+from src.caching import LRUCache, text_digest
 from src.entity_extractor import (
-    extract_entities,
-    extract_skills,
-    extract_experience_years,
-    detect_seniority,
-    extract_education_level,
+    ExtractedEntities,
+    extractor_fingerprint,
+    get_resume_entities,
+    run_extraction,
 )
 from src.skills_db import EDUCATION_LEVELS
 
@@ -13,95 +15,205 @@ def _education_score(level: Optional[str]) -> int:
         return 0
     return EDUCATION_LEVELS.get(level, 0)
 
-def _required_experience(job_text: str) -> int:
-    # Extract minimum years required from job description (heuristic)
-    years = extract_experience_years(job_text)
-    return years
+@dataclass(frozen=True)
+class JobRequirements:
+    """Parsed, immutable requirements of one job description.
 
-def _job_requirements(job_text: str):
-    return {
-        "skills": set(extract_skills(job_text)),
-        "seniority": detect_seniority(job_text),
-        "education_level": extract_education_level(job_text),
-        "min_years": _required_experience(job_text),
-    }
+    Build it once with prepare_job() and pass it to rank_candidates() in
+    place of the description text to skip re-parsing on every call.
+    """
+
+    skills: FrozenSet[str]
+    seniority: Optional[str]
+    education_level: Optional[str]
+    min_years: int
+    digest: str
 
-def rank_candidates(match_results: List[Dict], job_description: str) -> List[Dict]:
+_JOB_CACHE = LRUCache(maxsize=256)
+
+def prepare_job(job_description: str) -> JobRequirements:
+    """Parse a job description, memoized in a bounded LRU by content hash
+    and extractor fingerprint (so a vocabulary refresh re-parses it)."""
+    digest = text_digest(job_description)
+    key = (extractor_fingerprint(), digest)
+    req = _JOB_CACHE.get(key)
+    if req is None:
+        ents = run_extraction(job_description, include_organizations=False)
+        req = JobRequirements(
+            skills=frozenset(ents.skills),
+            seniority=ents.seniority,
+            education_level=ents.education,
+            # Minimum years required from job description (heuristic)
+            min_years=ents.experience_years,
+            digest=digest,
+        )
+        _JOB_CACHE.put(key, req)
+    return req
+
+def rank_candidates(match_results: List[Dict],
+                    job_description: Union[str, JobRequirements],
+                    top_k: Optional[int] = None,
+                    min_score: Optional[float] = None,
+                    similarities: Optional[Sequence[float]] = None) -> List[Dict]:
     """Rank candidates based on their match to job requirements.
     
     Args:
-        match_results: List of dicts with 'text' and 'filename' or 'name' keys
-        job_description: The job description text
+        match_results: List of dicts with 'text' and 'filename' or 'name' keys;
+            an 'entities' entry (ExtractedEntities or its dict form) is used
+            instead of re-extracting the text
+        job_description: The job description text, or JobRequirements
+            from prepare_job() to reuse an already parsed job
+        top_k: Return at most this many candidates (the best ones)
+        min_score: Drop candidates whose final score is below this (0..100)
+        similarities: Per-item similarity scores (0..100) to use instead of
+            each item's 'similarity' key, so one list of resume records can
+            be ranked against several jobs without copying it per job
         
     Returns:
-        List of ranked candidate dicts with scores
+        List of ranked candidate dicts with scores, best first; the order is
+        the same as a full sort truncated to the selected candidates
     """
-    req = _job_requirements(job_description)
-    req_skills = req["skills"]
-    req_seniority = req["seniority"]
-    req_edu = req["education_level"]
-    req_years = req["min_years"]
-
-    ranked: List[Dict] = []
-    for item in match_results:
-        ents = extract_entities(item["text"])
-        cand_skills = set(ents["skills"])
-        cand_years = ents["experience_years"]
-        cand_seniority = ents["seniority"]
-        cand_edu = ents["education"]
-
-        # Get similarity score, defaulting to 60.0 if not provided
-        base = item.get("similarity", 60.0)  # 0..100
-
-        # Skills bonus: overlap proportion relative to job requirements
-        skills_bonus = 0.0
-        matched_skills = sorted(req_skills & cand_skills)
-        if req_skills:
-            overlap_ratio = len(matched_skills) / max(1, len(req_skills))
-            skills_bonus = overlap_ratio * 20.0  # up to +20
-
-        # Experience bonus: meet/exceed requirement
-        exp_bonus = 0.0
-        if req_years:
-            if cand_years >= req_years:
-                # proportional up to +10
-                exp_bonus = min(10.0, (cand_years - req_years + 1) * 2.5)
-            else:
-                # small penalty if under-qualified
-                exp_bonus = -min(10.0, (req_years - cand_years) * 2.0)
-
-        # Seniority bonus: exact match +5
-        seniority_bonus = 0.0
-        if req_seniority and cand_seniority and req_seniority == cand_seniority:
-            seniority_bonus = 5.0
-
-        # Education bonus: if candidate meets or exceeds target
-        edu_bonus = 0.0
-        if req_edu:
-            if _education_score(cand_edu) >= _education_score(req_edu):
-                edu_bonus = 5.0
-
-        final_score = max(0.0, min(100.0, base + skills_bonus + exp_bonus + seniority_bonus + edu_bonus))
-
-        # Get name from either "name" or "filename" key
-        resume_name = item.get("name", item.get("filename", "Unknown Resume"))
-        
-        ranked.append(
-            {
-                "filename": resume_name,  # Use consistent key name
-                "similarity": round(base, 2),
-                "final_score": round(final_score, 2),
-                "matched_skills": matched_skills,
-                "all_skills": sorted(cand_skills),
-                "experience_years": cand_years,
-                "seniority": cand_seniority,
-                "education": cand_edu,
-                "reason": _build_reason(base, matched_skills, cand_years, req_years),
-            }
+    req = job_description if isinstance(job_description, JobRequirements) else prepare_job(job_description)
+    entities = [_item_entities(item) for item in match_results]
+    # Get similarity score, defaulting to 60.0 if not provided
+    if similarities is None:
+        similarities = [item.get("similarity", 60.0) for item in match_results]
+    base = np.array(similarities, dtype=np.float64)  # 0..100
+    final = _score_kernel(req, _feature_columns(req, entities), base)
+
+    # Select on the rounded scores (as reported)
+    rounded = np.array([round(score, 2) for score in final.tolist()], dtype=np.float64)
+    order = select_top(rounded, top_k=top_k, min_score=min_score)
+    return [
+        _materialize(match_results[i], entities[i], base[i], rounded[i], req)
+        for i in order.tolist()
+    ]
+
+def select_top(scores: np.ndarray, top_k: Optional[int] = None,
+               min_score: Optional[float] = None) -> np.ndarray:
+    """Indexes of the best scores, best first, ties kept in input order.
+
+    Scores below min_score are pruned first; the top_k cut uses
+    argpartition so only the selected candidates get sorted. The result
+    equals a stable descending sort truncated to top_k.
+    """
+    idx = np.arange(scores.shape[0])
+    if min_score is not None:
+        idx = idx[scores >= min_score]
+    if top_k is not None and top_k < idx.shape[0]:
+        if top_k <= 0:
+            return idx[:0]
+        cand = scores[idx]
+        kth = cand[np.argpartition(-cand, top_k - 1)[top_k - 1]]
+        # Everything above the k-th score, then ties at it in input order
+        above = idx[cand > kth]
+        ties = idx[cand == kth][:top_k - above.shape[0]]
+        idx = np.sort(np.concatenate([above, ties]))
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+def minimum_score_from_config(config) -> Optional[float]:
+    """Read config's minimum_score on the 0..100 final score scale.
+
+    config.yml expresses it as a fraction of the maximum score, from 0 to
+    1 (0.6 means 60); anything outside that range is rejected with
+    ValueError rather than guessed at.
+    """
+    value = config.get("minimum_score")
+    if value is None:
+        return None
+    value = float(value)
+    if not 0.0 <= value <= 1.0:
+        raise ValueError(
+            f"minimum_score must be a fraction between 0 and 1 (e.g. 0.6 for 60%), got {value}"
         )
+    return value * 100.0
 
-    ranked.sort(key=lambda x: x["final_score"], reverse=True)
-    return ranked
+def _item_entities(item: Dict) -> ExtractedEntities:
+    ents = item.get("entities")
+    if ents is None:
+        return get_resume_entities(item["text"])
+    if isinstance(ents, dict):
+        return ExtractedEntities(**ents)
+    return ents
+
+def _feature_columns(req: JobRequirements, entities: List[ExtractedEntities]) -> Dict[str, np.ndarray]:
+    """Encode candidate features column-wise for the scoring kernel.
+
+    skills: bool matrix, one row per candidate and one column per required skill
+    years: experience years; education: EDUCATION_LEVELS score
+    seniority: True where the candidate's seniority equals the job's
+    """
+    skill_index = {skill: col for col, skill in enumerate(sorted(req.skills))}
+    skills = np.zeros((len(entities), len(skill_index)), dtype=bool)
+    for row, ents in enumerate(entities):
+        for skill in ents.skills:
+            col = skill_index.get(skill)
+            if col is not None:
+                skills[row, col] = True
+    return {
+        "skills": skills,
+        "years": np.array([ents.experience_years for ents in entities], dtype=np.float64),
+        "seniority": np.array(
+            [bool(req.seniority) and ents.seniority == req.seniority for ents in entities], dtype=bool
+        ),
+        "education": np.array([_education_score(ents.education) for ents in entities], dtype=np.int64),
+    }
+
+def _score_kernel(req: JobRequirements, cols: Dict[str, np.ndarray], base: np.ndarray) -> np.ndarray:
+    """Compute every candidate's final score (0..100) in one vectorized pass."""
+    n = base.shape[0]
+
+    # Skills bonus: overlap proportion relative to job requirements
+    skills_bonus = np.zeros(n)
+    if req.skills:
+        overlap_ratio = cols["skills"].sum(axis=1) / max(1, len(req.skills))
+        skills_bonus = overlap_ratio * 20.0  # up to +20
+
+    # Experience bonus: meet/exceed requirement
+    exp_bonus = np.zeros(n)
+    req_years = req.min_years
+    if req_years:
+        years = cols["years"]
+        exp_bonus = np.where(
+            years >= req_years,
+            # proportional up to +10
+            np.minimum(10.0, (years - req_years + 1) * 2.5),
+            # small penalty if under-qualified
+            -np.minimum(10.0, (req_years - years) * 2.0),
+        )
+
+    # Seniority bonus: exact match +5
+    seniority_bonus = np.where(cols["seniority"], 5.0, 0.0)
+
+    # Education bonus: if candidate meets or exceeds target
+    edu_bonus = np.zeros(n)
+    if req.education_level:
+        edu_bonus = np.where(cols["education"] >= _education_score(req.education_level), 5.0, 0.0)
+
+    return np.clip(base + skills_bonus + exp_bonus + seniority_bonus + edu_bonus, 0.0, 100.0)
+
+def _materialize(item: Dict, ents: ExtractedEntities, base: float, final_score: float,
+                 req: JobRequirements) -> Dict:
+    """Build the result dict (and reason text) for one returned candidate."""
+    cand_skills = set(ents.skills)
+    matched_skills = sorted(req.skills & cand_skills)
+    base = float(base)
+    # Get name from either "name" or "filename" key
+    resume_name = item.get("name", item.get("filename", "Unknown Resume"))
+    result = {
+        "filename": resume_name,  # Use consistent key name
+        "similarity": round(base, 2),
+        "final_score": float(final_score),
+        "matched_skills": matched_skills,
+        "all_skills": sorted(cand_skills),
+        "experience_years": ents.experience_years,
+        "seniority": ents.seniority,
+        "education": ents.education,
+        "reason": _build_reason(base, matched_skills, ents.experience_years, req.min_years),
+    }
+    if "id" in item:
+        result["id"] = item["id"]
+    return result
 
 def _build_reason(base: float, matched_skills: List[str], cand_years: int, req_years: int) -> str:
     parts = []
@@ -13,16 +13,57 @@ class Config:
                 "education": 0.2
             },
             "minimum_score": 0.6,
+            "top_k": None,
             "preferred_formats": ["pdf", "docx", "txt"],
+            "ingestion": {
+                "workers": 0,
+                "timeout_seconds": 30,
+                "max_pages": None,
+                "max_chars": None,
+                "streaming": False
+            },
+            "uploads": {
+                "spool_max_kb": 1024
+            },
+            "job_queue": {
+                "enabled": True,
+                "workers": 2,
+                "max_pending": 8,
+                "keep_finished": 100,
+                "page_size": 50,
+                "spool_max_kb": 64
+            },
             "spacy_model": "en_core_web_sm",
+            "ner": {
+                "enabled": True,
+                "n_process": 1,
+                "batch_size": 32
+            },
             "sentence_transformer_model": "all-MiniLM-L6-v2",
             "database": {
                 "path": "resume_screening.db"
             },
+            "extraction_cache": {
+                "enabled": True,
+                "path": ".cache/extraction.db",
+                "store_entities": True
+            },
+            "embedding_cache": {
+                "enabled": True,
+                "path": ".cache/embeddings",
+                "max_disk_mb": 512,
+                "memory_items": 2048
+            },
+            "embedding_service": {
+                "enabled": True,
+                "max_batch": 32,
+                "max_latency_ms": 10
+            },
             "api": {
                 "enable_rest_api": False,
                 "port": 5000,
-                "host": "127.0.0.1"
+                "host": "127.0.0.1",
+                "debug": False
             }
         }
         self.config = self._load_config()
@@ -1,19 +1,208 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 import sqlite3
 import json
-from datetime import datetime
-import os
+import threading
+import weakref
+from contextlib import contextmanager
+from itertools import islice
+
+from src.caching import text_digest
+
+# Schema migrations applied after the base tables exist, in order;
+# PRAGMA user_version records how many have run.
+_MIGRATIONS = [
+    # 1: content hash so re-screened resumes map to their existing candidate
+    [
+        "ALTER TABLE candidates ADD COLUMN content_hash TEXT",
+        """CREATE UNIQUE INDEX IF NOT EXISTS idx_candidates_content_hash
+           ON candidates (content_hash) WHERE content_hash IS NOT NULL""",
+    ],
+    # 2: indexes for per-job / per-candidate screening lookups, and skills
+    #    normalized into their own table so SQL can count and filter them
+    [
+        """CREATE INDEX IF NOT EXISTS idx_screenings_job_score
+           ON screenings (job_id, total_score DESC, candidate_id)""",
+        """CREATE INDEX IF NOT EXISTS idx_screenings_candidate
+           ON screenings (candidate_id, created_at DESC)""",
+        """CREATE TABLE IF NOT EXISTS candidate_skills (
+               candidate_id INTEGER NOT NULL REFERENCES candidates (id),
+               skill TEXT NOT NULL,
+               PRIMARY KEY (candidate_id, skill)
+           ) WITHOUT ROWID""",
+        """CREATE INDEX IF NOT EXISTS idx_candidate_skills_skill
+           ON candidate_skills (skill, candidate_id)""",
+        """INSERT OR IGNORE INTO candidate_skills (candidate_id, skill)
+           SELECT c.id, j.value
+           FROM candidates c, json_each(c.skills) j
+           WHERE json_valid(c.skills) AND j.type = 'text'""",
+    ],
+]
+
+_CANDIDATE_COLUMNS = ("name", "email", "phone", "resume_text",
+                      "skills", "experience_years", "education_level")
+_SCREENING_COLUMNS = ("job_id", "candidate_id", "similarity_score",
+                      "skill_match_score", "total_score", "feedback")
+
+_INSERT_CANDIDATE = """
+    INSERT INTO candidates (name, email, phone, resume_text,
+                         skills, experience_years, education_level)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+_UPSERT_CANDIDATE = """
+    INSERT INTO candidates (name, email, phone, resume_text,
+                         skills, experience_years, education_level, content_hash)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (content_hash) WHERE content_hash IS NOT NULL DO UPDATE SET
+        name = excluded.name,
+        email = excluded.email,
+        phone = excluded.phone,
+        skills = excluded.skills,
+        experience_years = excluded.experience_years,
+        education_level = excluded.education_level
+"""
+_INSERT_SKILL = "INSERT OR IGNORE INTO candidate_skills (candidate_id, skill) VALUES (?, ?)"
+_INSERT_SCREENING = """
+    INSERT INTO screenings (job_id, candidate_id, similarity_score,
+                         skill_match_score, total_score, feedback)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+# Columns for paginated job results; resume_text is opt-in
+_PAGE_COLUMNS = """
+    c.id, c.name, c.email, c.phone, c.skills, c.experience_years,
+    c.education_level, c.created_at,
+    s.id AS screening_id, s.similarity_score, s.skill_match_score,
+    s.total_score, s.feedback
+"""
+
+# Row source shared by the per-job aggregates, so counts, offsets and
+# samples all see the same screenings (those with a candidate row)
+_JOB_SCREENINGS = """
+    FROM screenings s
+    JOIN candidates c ON c.id = s.candidate_id
+    WHERE s.job_id = ?
+"""
+
+# Keep IN (...) lists under SQLite's host parameter limit
+_MAX_PARAMS = 500
+
+def _chunks(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _write_skills(cur: sqlite3.Cursor, candidate_ids: List[int],
+                  skill_lists: List[List[str]], replace: bool = False):
+    """Mirror candidates' skills into the candidate_skills table."""
+    if replace:
+        cur.executemany("DELETE FROM candidate_skills WHERE candidate_id = ?",
+                        [(cid,) for cid in candidate_ids])
+    cur.executemany(_INSERT_SKILL, [
+        (cid, skill) for cid, skills in zip(candidate_ids, skill_lists) for skill in skills or []
+    ])
+
+def _candidate_row(candidate: Dict[str, Any]) -> tuple:
+    return tuple(
+        json.dumps(candidate.get(col) or []) if col == "skills" else candidate.get(col)
+        for col in _CANDIDATE_COLUMNS
+    )
+
+class _ConnectionHolder:
+    """Per-thread box for a connection (sqlite3.Connection can't be weakly referenced)."""
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+def _release_connection(conn: sqlite3.Connection, connections: List[sqlite3.Connection],
+                        lock: threading.Lock):
+    with lock:
+        if conn in connections:
+            connections.remove(conn)
+    conn.close()
 
 class Database:
-    def __init__(self, db_path: str = "resume_screening.db"):
+    """SQLite storage for jobs, candidates and screening results.
+
+    Each thread gets one connection for as long as it lives (so SQLite's
+    per-connection prepared statement cache is reused across calls; it is
+    closed when the thread exits), the database runs in
+    WAL mode so readers never block the writer, and writes take the write
+    lock up front with BEGIN IMMEDIATE and wait up to ``busy_timeout``
+    seconds for it instead of failing with "database is locked".
+
+    Note: with ``db_path=":memory:"`` every thread sees its own database.
+    """
+
+    def __init__(self, db_path: str = "resume_screening.db",
+                 busy_timeout: float = 30.0,
+                 cache_size_kb: int = 64 * 1024,
+                 mmap_size: int = 256 * 1024 * 1024):
         self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
         self._init_db()
 
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening and tuning it on first use."""
+        holder = getattr(self._local, "holder", None)
+        conn = holder.conn if holder is not None else None
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=self.busy_timeout,
+                isolation_level=None,  # explicit transactions via _transaction()
+                check_same_thread=False,  # only so close() can run from any thread
+                cached_statements=256,
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Safe with WAL: a crash may lose the last commits but never corrupts
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kb)}")
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            # The holder lives only in this thread's local storage; when the
+            # thread exits it is collected and the connection is closed, so
+            # short-lived request threads don't leak file descriptors.
+            holder = _ConnectionHolder(conn)
+            weakref.finalize(holder, _release_connection, conn,
+                             self._connections, self._connections_lock)
+            self._local.holder = holder
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Run the block in one write transaction on this thread's connection."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn.cursor()
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    def close(self):
+        """Close every pooled connection."""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
     def _init_db(self):
         """Initialize the database with required tables."""
-        with sqlite3.connect(self.db_path) as conn:
-            cur = conn.cursor()
-            
+        with self._transaction() as cur:
             # Create jobs table
             cur.execute("""
                 CREATE TABLE IF NOT EXISTS jobs (
@@ -25,7 +214,7 @@ class Database:
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """)
-            
+
             # Create candidates table
             cur.execute("""
                 CREATE TABLE IF NOT EXISTS candidates (
@@ -40,7 +229,7 @@ class Database:
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """)
-            
+
             # Create screenings table
             cur.execute("""
                 CREATE TABLE IF NOT EXISTS screenings (
@@ -56,74 +245,341 @@ class Database:
                     FOREIGN KEY (candidate_id) REFERENCES candidates (id)
                 )
             """)
-            
-            conn.commit()
 
-    def add_job(self, title: str, description: str, required_skills: List[str], 
+            version = cur.execute("PRAGMA user_version").fetchone()[0]
+            for number, statements in enumerate(_MIGRATIONS[version:], start=version + 1):
+                for statement in statements:
+                    cur.execute(statement)
+                cur.execute(f"PRAGMA user_version = {number}")
+
+    def add_job(self, title: str, description: str, required_skills: List[str],
                 preferred_skills: List[str]) -> int:
         """Add a new job posting and return its ID."""
-        with sqlite3.connect(self.db_path) as conn:
-            cur = conn.cursor()
+        with self._transaction() as cur:
             cur.execute("""
                 INSERT INTO jobs (title, description, required_skills, preferred_skills)
                 VALUES (?, ?, ?, ?)
-            """, (title, description, 
-                  json.dumps(required_skills), 
+            """, (title, description,
+                  json.dumps(required_skills),
                   json.dumps(preferred_skills)))
             return cur.lastrowid
 
-    def add_candidate(self, name: str, email: str, phone: str, 
-                     resume_text: str, skills: List[str], 
+    def add_candidate(self, name: str, email: str, phone: str,
+                     resume_text: str, skills: List[str],
                      experience_years: int, education_level: str) -> int:
         """Add a new candidate and return their ID."""
-        with sqlite3.connect(self.db_path) as conn:
-            cur = conn.cursor()
-            cur.execute("""
-                INSERT INTO candidates (name, email, phone, resume_text, 
-                                     skills, experience_years, education_level)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (name, email, phone, resume_text,
-                  json.dumps(skills), experience_years, education_level))
-            return cur.lastrowid
+        with self._transaction() as cur:
+            cur.execute(_INSERT_CANDIDATE, (name, email, phone, resume_text,
+                                            json.dumps(skills), experience_years, education_level))
+            candidate_id = cur.lastrowid
+            _write_skills(cur, [candidate_id], [skills])
+            return candidate_id
 
-    def add_screening(self, job_id: int, candidate_id: int, 
+    def add_screening(self, job_id: int, candidate_id: int,
                      similarity_score: float, skill_match_score: float,
                      total_score: float, feedback: str) -> int:
         """Record a screening result."""
-        with sqlite3.connect(self.db_path) as conn:
-            cur = conn.cursor()
-            cur.execute("""
-                INSERT INTO screenings (job_id, candidate_id, similarity_score,
-                                     skill_match_score, total_score, feedback)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (job_id, candidate_id, similarity_score,
-                  skill_match_score, total_score, feedback))
+        with self._transaction() as cur:
+            cur.execute(_INSERT_SCREENING, (job_id, candidate_id, similarity_score,
+                                            skill_match_score, total_score, feedback))
             return cur.lastrowid
 
+    @staticmethod
+    def _insert_chunk(cur: sqlite3.Cursor, sql: str, rows: List[tuple]) -> List[int]:
+        cur.executemany(sql, rows)
+        # The write lock is held and ids are AUTOINCREMENT, so the chunk's
+        # rows got consecutive ids ending at last_insert_rowid
+        last = cur.execute("SELECT last_insert_rowid()").fetchone()[0]
+        return list(range(last - len(rows) + 1, last + 1))
+
+    def add_candidates_many(self, candidates: Iterable[Dict[str, Any]],
+                            chunk_size: int = 1000) -> List[int]:
+        """Insert many candidates in one transaction; returns their IDs in order.
+
+        Each dict uses add_candidate's parameter names as keys.
+        """
+        ids: List[int] = []
+        with self._transaction() as cur:
+            for chunk in _chunks(candidates, chunk_size):
+                chunk_ids = self._insert_chunk(cur, _INSERT_CANDIDATE, [_candidate_row(c) for c in chunk])
+                _write_skills(cur, chunk_ids, [c.get("skills") for c in chunk])
+                ids.extend(chunk_ids)
+        return ids
+
+    def add_screenings_many(self, screenings: Iterable[Dict[str, Any]],
+                            chunk_size: int = 1000) -> List[int]:
+        """Record many screening results in one transaction; returns their IDs.
+
+        Each dict uses add_screening's parameter names as keys.
+        """
+        ids: List[int] = []
+        with self._transaction() as cur:
+            for chunk in _chunks(screenings, chunk_size):
+                rows = [tuple(s.get(col) for col in _SCREENING_COLUMNS) for s in chunk]
+                ids.extend(self._insert_chunk(cur, _INSERT_SCREENING, rows))
+        return ids
+
+    def upsert_candidates_many(self, candidates: Iterable[Dict[str, Any]],
+                               chunk_size: int = 1000) -> List[int]:
+        """Insert or update candidates keyed by a hash of their resume text.
+
+        A resume that was stored before (through this method) keeps its
+        candidate row and ID; its other fields are refreshed. Candidates
+        without resume text have nothing to key on and are always inserted
+        as new rows. Returns the candidate IDs in input order.
+        """
+        ids: List[int] = []
+        with self._transaction() as cur:
+            for chunk in _chunks(candidates, chunk_size):
+                hashes = [text_digest(c["resume_text"]) if c.get("resume_text") else None
+                          for c in chunk]
+                cur.executemany(_UPSERT_CANDIDATE, [
+                    _candidate_row(c) + (h,) for c, h in zip(chunk, hashes) if h is not None
+                ])
+                id_by_hash: Dict[str, int] = {}
+                for part in _chunks({h for h in hashes if h is not None}, _MAX_PARAMS):
+                    cur.execute(
+                        f"SELECT id, content_hash FROM candidates "
+                        f"WHERE content_hash IN ({','.join('?' * len(part))})",
+                        part,
+                    )
+                    id_by_hash.update((h, i) for i, h in cur.fetchall())
+                chunk_ids = []
+                for c, h in zip(chunk, hashes):
+                    if h is None:
+                        # NULL content_hash is outside the unique index: a plain insert
+                        cur.execute(_UPSERT_CANDIDATE, _candidate_row(c) + (None,))
+                        chunk_ids.append(cur.lastrowid)
+                    else:
+                        chunk_ids.append(id_by_hash[h])
+                _write_skills(cur, chunk_ids, [c.get("skills") for c in chunk], replace=True)
+                ids.extend(chunk_ids)
+        return ids
+
     def get_candidate_history(self, candidate_id: int) -> List[Dict[str, Any]]:
         """Get screening history for a candidate."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT s.*, j.title as job_title
-                FROM screenings s
-                JOIN jobs j ON s.job_id = j.id
-                WHERE s.candidate_id = ?
-                ORDER BY s.created_at DESC
-            """, (candidate_id,))
-            return [dict(row) for row in cur.fetchall()]
+        cur = self._connect().execute("""
+            SELECT s.*, j.title as job_title
+            FROM screenings s
+            JOIN jobs j ON s.job_id = j.id
+            WHERE s.candidate_id = ?
+            ORDER BY s.created_at DESC
+        """, (candidate_id,))
+        return [dict(row) for row in cur.fetchall()]
 
     def get_job_candidates(self, job_id: int) -> List[Dict[str, Any]]:
         """Get all candidates screened for a specific job."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT c.*, s.total_score, s.feedback
-                FROM candidates c
-                JOIN screenings s ON c.id = s.candidate_id
+        cur = self._connect().execute("""
+            SELECT c.*, s.total_score, s.feedback
+            FROM candidates c
+            JOIN screenings s ON c.id = s.candidate_id
+            WHERE s.job_id = ?
+            ORDER BY s.total_score DESC
+        """, (job_id,))
+        return [dict(row) for row in cur.fetchall()]
+
+    def get_job_candidates_page(self, job_id: int, limit: int = 50,
+                                cursor: Optional[Tuple[Optional[float], int, int]] = None,
+                                include_resume_text: bool = False
+                                ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[Optional[float], int, int]]]:
+        """One page of a job's candidates, best total_score first.
+
+        Uses keyset pagination: pass the returned cursor to get the next
+        page (None means there are no more rows), so every page costs the
+        same however deep it is. Rows are ordered by (total_score DESC,
+        candidate id, screening id), which the job/score index serves
+        directly, with unscored screenings last; rows omit resume_text
+        unless include_resume_text is set.
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        columns = _PAGE_COLUMNS + (", c.resume_text" if include_resume_text else "")
+
+        def fetch(where: str, params: Tuple, count: int) -> List[Dict[str, Any]]:
+            return [dict(row) for row in self._connect().execute(f"""
+                SELECT {columns}
+                FROM screenings s
+                JOIN candidates c ON c.id = s.candidate_id
+                WHERE s.job_id = ? AND {where}
+                ORDER BY s.total_score DESC, s.candidate_id, s.id
+                LIMIT ?
+            """, (job_id,) + params + (count,))]
+
+        # Scored rows first; unscored (NULL) rows sort last, as in
+        # get_job_candidates, and are walked by (candidate id, screening id)
+        rows: List[Dict[str, Any]] = []
+        if cursor is None:
+            rows = fetch("s.total_score IS NOT NULL", (), limit)
+        elif cursor[0] is not None:
+            score, candidate_id, screening_id = cursor
+            # The plain <= bound lets SQLite seek into the index to the cursor
+            rows = fetch("""s.total_score <= ? AND (s.total_score < ? OR (s.total_score = ? AND (
+                s.candidate_id > ? OR (s.candidate_id = ? AND s.id > ?))))""",
+                         (score, score, score, candidate_id, candidate_id, screening_id), limit)
+        if len(rows) < limit:
+            where, params = "s.total_score IS NULL", ()
+            if cursor is not None and cursor[0] is None:
+                _, candidate_id, screening_id = cursor
+                where += " AND (s.candidate_id > ? OR (s.candidate_id = ? AND s.id > ?))"
+                params = (candidate_id, candidate_id, screening_id)
+            rows += fetch(where, params, limit - len(rows))
+        next_cursor = None
+        if len(rows) == limit:
+            last = rows[-1]
+            next_cursor = (last["total_score"], last["id"], last["screening_id"])
+        return rows, next_cursor
+
+    def iter_job_candidates(self, job_id: int, page_size: int = 500,
+                            include_resume_text: bool = False) -> Iterator[Dict[str, Any]]:
+        """Stream a job's candidates page by page at constant memory."""
+        cursor = None
+        while True:
+            rows, cursor = self.get_job_candidates_page(
+                job_id, limit=page_size, cursor=cursor, include_resume_text=include_resume_text
+            )
+            yield from rows
+            if cursor is None:
+                return
+
+    def skill_frequencies(self, limit: Optional[int] = None,
+                          job_id: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Count candidates per skill, most common first.
+
+        With job_id, only candidates screened for that job are counted.
+        """
+        if job_id is None:
+            sql = """
+                SELECT skill, COUNT(*) AS n
+                FROM candidate_skills
+                GROUP BY skill
+                ORDER BY n DESC, skill
+            """
+            params: Tuple = ()
+        else:
+            sql = """
+                SELECT cs.skill, COUNT(DISTINCT cs.candidate_id) AS n
+                FROM screenings s
+                JOIN candidate_skills cs ON cs.candidate_id = s.candidate_id
                 WHERE s.job_id = ?
-                ORDER BY s.total_score DESC
-            """, (job_id,))
-            return [dict(row) for row in cur.fetchall()]
+                GROUP BY cs.skill
+                ORDER BY n DESC, cs.skill
+            """
+            params = (job_id,)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params += (limit,)
+        return [(row[0], row[1]) for row in self._connect().execute(sql, params)]
+
+    def find_candidates_with_skills(self, skills: List[str], match_all: bool = True,
+                                    limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Candidates having all (or, with match_all=False, any) of skills.
+
+        Rows omit resume_text; ordered by candidate ID.
+        """
+        skills = sorted(set(skills))
+        if not skills:
+            return []
+        sql = f"""
+            SELECT c.id, c.name, c.email, c.phone, c.experience_years, c.education_level
+            FROM candidates c
+            JOIN (
+                SELECT candidate_id
+                FROM candidate_skills
+                WHERE skill IN ({','.join('?' * len(skills))})
+                GROUP BY candidate_id
+                HAVING COUNT(*) >= ?
+            ) m ON m.candidate_id = c.id
+            ORDER BY c.id
+        """
+        params: Tuple = (*skills, len(skills) if match_all else 1)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params += (limit,)
+        return [dict(row) for row in self._connect().execute(sql, params)]
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Get a job posting by ID."""
+        row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def get_all_candidates(self, include_resume_text: bool = False) -> List[Dict[str, Any]]:
+        """Get every candidate (without resume_text unless requested)."""
+        columns = "id, name, email, phone, skills, experience_years, education_level, created_at"
+        if include_resume_text:
+            columns += ", resume_text"
+        return [dict(row) for row in self._connect().execute(
+            f"SELECT {columns} FROM candidates ORDER BY id"
+        )]
+
+    def score_summary(self, job_id: int,
+                      percentiles: Iterable[float] = (25, 50, 75, 90)) -> Dict[str, Any]:
+        """Count, mean, min, max, mean experience and score percentiles for a job.
+
+        Percentiles use linear interpolation (as numpy.percentile does); each
+        is read with an ORDER BY ... LIMIT 2 OFFSET query walking the
+        job/score index, so no scores are loaded into Python (the OFFSET
+        still steps over the rows before it).
+        """
+        conn = self._connect()
+        row = conn.execute(f"""
+            SELECT COUNT(s.total_score), AVG(s.total_score), MIN(s.total_score),
+                   MAX(s.total_score), AVG(c.experience_years)
+            {_JOB_SCREENINGS}
+        """, (job_id,)).fetchone()
+        count = row[0]
+        summary: Dict[str, Any] = {
+            "count": count,
+            "mean": row[1],
+            "min": row[2],
+            "max": row[3],
+            "mean_experience": row[4],
+            "percentiles": {},
+        }
+        for p in percentiles:
+            if not count:
+                summary["percentiles"][p] = None
+                continue
+            pos = (count - 1) * p / 100.0
+            lo = int(pos)
+            values = [r[0] for r in conn.execute(f"""
+                SELECT s.total_score
+                {_JOB_SCREENINGS} AND s.total_score IS NOT NULL
+                ORDER BY s.total_score
+                LIMIT 2 OFFSET ?
+            """, (job_id, lo))]
+            hi_value = values[1] if len(values) > 1 else values[0]
+            summary["percentiles"][p] = values[0] + (hi_value - values[0]) * (pos - lo)
+        return summary
+
+    def score_histogram(self, job_id: int, bins: int = 20) -> List[Tuple[float, float, int]]:
+        """Bucket a job's scores into equal-width bins between its min and max.
+
+        Returns (lower edge, upper edge, count) for every bin, counted in SQL.
+        """
+        if bins < 1:
+            raise ValueError("bins must be at least 1")
+        conn = self._connect()
+        lo, hi = conn.execute(
+            f"SELECT MIN(s.total_score), MAX(s.total_score) {_JOB_SCREENINGS}", (job_id,)
+        ).fetchone()
+        if lo is None:
+            return []
+        width = (hi - lo) / bins or 1.0
+        counts = dict(conn.execute(f"""
+            SELECT MIN(CAST((s.total_score - ?) / ? AS INTEGER), ?) AS bucket, COUNT(*)
+            {_JOB_SCREENINGS} AND s.total_score IS NOT NULL
+            GROUP BY bucket
+        """, (lo, width, bins - 1, job_id)).fetchall())
+        return [(lo + i * width, lo + (i + 1) * width, counts.get(i, 0)) for i in range(bins)]
+
+    def experience_score_samples(self, job_id: int,
+                                 limit: int = 5000) -> List[Tuple[Optional[int], float]]:
+        """(experience_years, total_score) pairs for a job, randomly sampled
+        down to ``limit`` points for large jobs."""
+        sql = f"SELECT c.experience_years, s.total_score {_JOB_SCREENINGS}"
+        conn = self._connect()
+        (count,) = conn.execute(f"SELECT COUNT(*) {_JOB_SCREENINGS}", (job_id,)).fetchone()
+        if count > limit:
+            sql += " ORDER BY RANDOM() LIMIT ?"
+            return [tuple(r) for r in conn.execute(sql, (job_id, limit))]
+        return [tuple(r) for r in conn.execute(sql, (job_id,))]
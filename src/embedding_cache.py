@@ -0,0 +1,171 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from src.caching import LRUCache, text_digest
+
+# Keys per "IN (...)" lookup, well under SQLite's bound-parameter limit
+_LOOKUP_CHUNK = 500
+
+class EmbeddingCache:
+    """Two-tier cache of sentence embeddings keyed by hash(model name + text).
+
+    Vectors are kept in an in-process LRU and persisted as little-endian
+    float32 BLOBs in a SQLite database at ``directory/<model>/vectors.db``
+    (WAL mode, so several processes can share it). The disk tier is
+    bounded by ``max_disk_bytes`` of vector data; the least recently used
+    rows are evicted first and SQLite reuses their pages.
+    """
+
+    def __init__(self, directory: str, model_name: str,
+                 max_disk_bytes: int = 512 * 1024 * 1024,
+                 memory_items: int = 2048):
+        self.model_name = model_name
+        self.directory = os.path.join(directory, re.sub(r"[^A-Za-z0-9_.-]", "_", model_name))
+        self.max_disk_bytes = max_disk_bytes
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = LRUCache(memory_items)
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(self.directory, "vectors.db"), timeout=30,
+                                   check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS vectors (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_vectors_last_used ON vectors (last_used)")
+        self._disk_bytes = self._stored_bytes()
+
+    def close(self):
+        self._db.close()
+
+    def _stored_bytes(self) -> int:
+        return self._db.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM vectors").fetchone()[0]
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        found, _ = self.get_many([text])
+        return found.get(0)
+
+    def get_many(self, texts: Sequence[str]) -> Tuple[Dict[int, np.ndarray], List[int]]:
+        """Look up several texts; returns ({index: vector}, [missing indexes]).
+
+        Texts not in memory are read with a few batched queries, and their
+        last-use times are refreshed in one transaction.
+        """
+        found: Dict[int, np.ndarray] = {}
+        on_disk: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            key = text_digest(text, self.model_name)
+            vector = self._memory.get(key)
+            if vector is not None:
+                self.memory_hits += 1
+                found[i] = vector
+            else:
+                on_disk.setdefault(key, []).append(i)
+
+        if on_disk:
+            keys = list(on_disk)
+            rows = []
+            with self._lock:
+                for start in range(0, len(keys), _LOOKUP_CHUNK):
+                    chunk = keys[start:start + _LOOKUP_CHUNK]
+                    rows += self._db.execute(
+                        f"SELECT key, vector FROM vectors WHERE key IN ({','.join('?' * len(chunk))})",
+                        chunk,
+                    ).fetchall()
+                if rows:
+                    now = time.time()
+                    self._db.execute("BEGIN IMMEDIATE")
+                    self._db.executemany("UPDATE vectors SET last_used = ? WHERE key = ?",
+                                         [(now, key) for key, _ in rows])
+                    self._db.execute("COMMIT")
+            for key, blob in rows:
+                vector = np.frombuffer(blob, dtype="<f4")
+                self._memory.put(key, vector)
+                for i in on_disk.pop(key):
+                    self.disk_hits += 1
+                    found[i] = vector
+
+        missing = sorted(i for indexes in on_disk.values() for i in indexes)
+        self.misses += len(missing)
+        return found, missing
+
+    def put(self, text: str, vector: np.ndarray):
+        self.put_many([text], [vector])
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[np.ndarray]):
+        """Store several vectors in one transaction, evicting at most once."""
+        rows = []
+        for text, vector in zip(texts, vectors):
+            key = text_digest(text, self.model_name)
+            vector = np.asarray(vector, dtype="<f4")
+            self._memory.put(key, vector)
+            rows.append((key, vector.tobytes()))
+        if not rows:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            added = 0
+            for key, blob in rows:
+                if self._db.execute(
+                        "INSERT OR IGNORE INTO vectors (key, vector, last_used) VALUES (?, ?, ?)",
+                        (key, blob, now)).rowcount:
+                    added += len(blob)
+            self._db.execute("COMMIT")
+            self._disk_bytes += added
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Other processes may share the database: start from its real total
+        total = self._stored_bytes()
+        # Trim down to 90% of the budget so eviction doesn't run on every put
+        target = int(self.max_disk_bytes * 0.9)
+        evicted = []
+        cursor = self._db.execute("SELECT key, LENGTH(vector) FROM vectors ORDER BY last_used")
+        for key, size in cursor:
+            if total <= target:
+                break
+            evicted.append((key,))
+            total -= size
+        cursor.close()
+        if evicted:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.executemany("DELETE FROM vectors WHERE key = ?", evicted)
+            self._db.execute("COMMIT")
+        self._disk_bytes = total
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_items": len(self._memory),
+            "disk_bytes": self._disk_bytes,
+        }
+
+def cache_from_config(config, model_name: str, base_dir: str = ".") -> Optional[EmbeddingCache]:
+    """Build an EmbeddingCache from the ``embedding_cache`` config section."""
+    if not config.get("embedding_cache.enabled", False):
+        return None
+    path = config.get("embedding_cache.path", ".cache/embeddings")
+    return EmbeddingCache(
+        os.path.join(base_dir, path),
+        model_name,
+        max_disk_bytes=int(config.get("embedding_cache.max_disk_mb", 512)) * 1024 * 1024,
+        memory_items=int(config.get("embedding_cache.memory_items", 2048)),
+    )
@@ -0,0 +1,183 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+class _Request:
+    """One caller's texts, how many have been batched so far, and the
+    embedding rows returned for them."""
+
+    __slots__ = ("texts", "future", "taken", "rows")
+
+    def __init__(self, texts: List[str], future: Future):
+        self.texts = texts
+        self.future = future
+        self.taken = 0
+        self.rows: List[np.ndarray] = []
+
+class EmbeddingBatcher:
+    """Coalesce encode requests from many threads into shared model calls.
+
+    Callers submit texts and get a Future; a single background thread
+    gathers pending requests until ``max_batch`` texts are waiting or the
+    oldest has waited ``max_latency_ms``, encodes them (each distinct text
+    once) with one ``encode`` call, and resolves every caller's future with
+    its own rows. Each model call takes at most max_batch texts, drawn
+    round-robin from the waiting requests, so a large request is encoded
+    over several calls and small requests that arrive meanwhile are served
+    between them instead of waiting for it to finish.
+    """
+
+    def __init__(self, encode: Callable[[List[str]], np.ndarray], max_batch: int = 32,
+                 max_latency_ms: float = 10.0):
+        self._encode = encode
+        self.max_batch = max_batch
+        self.max_latency = max_latency_ms / 1000.0
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._closed = False
+        # Guards _closed so no request can be queued behind the stop sentinel
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.texts = 0
+        self._thread = threading.Thread(target=self._serve, name="embedding-batcher",
+                                        daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: Sequence[str]) -> Future:
+        """Queue texts for encoding; the future resolves to their embeddings."""
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("EmbeddingBatcher is closed")
+            self._queue.put(_Request(list(texts), future))
+        return future
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Encode texts as part of the next shared batch, blocking until done."""
+        return self.submit(texts).result()
+
+    def close(self):
+        """Stop the worker after the requests already queued are served."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+
+    def _serve(self):
+        active: Deque[_Request] = deque()
+        stop = False
+        while True:
+            if not active:
+                if stop:
+                    return
+                first = self._queue.get()
+                if first is None:
+                    return
+                active.append(first)
+                # Idle: give other callers up to max_latency to join the batch
+                stop = self._gather(active, time.monotonic() + self.max_latency)
+            elif not stop:
+                # Backlogged: pick up new arrivals without waiting for more
+                stop = self._gather(active, None)
+            batch = self._take(active)
+            try:
+                self._run(batch)
+            except BaseException as e:
+                # Never let one bad batch kill the thread every caller waits on
+                for request, _ in batch:
+                    self._fail(request, e)
+
+    def _gather(self, active: Deque[_Request], deadline: Optional[float]) -> bool:
+        """Move queued requests into ``active``; True once the stop sentinel
+        was seen.
+
+        With a deadline, stop when a batch is full or the deadline passes;
+        without one, take everything already queued so new arrivals join
+        the round-robin right away.
+        """
+        size = sum(len(request.texts) - request.taken for request in active)
+        while deadline is None or size < self.max_batch:
+            try:
+                if deadline is None:
+                    item = self._queue.get_nowait()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return True
+            active.append(item)
+            size += len(item.texts)
+        return False
+
+    def _take(self, active: Deque[_Request]) -> List[Tuple[_Request, List[str]]]:
+        """Take up to max_batch texts, one slice per request in turn; requests
+        with texts left over go to the back of the line."""
+        batch = []
+        size = 0
+        for _ in range(len(active)):
+            if size >= self.max_batch:
+                break
+            request = active.popleft()
+            # Callers may have cancelled their futures while they were queued
+            if request.future.done() or (
+                    request.taken == 0 and not request.future.set_running_or_notify_cancel()):
+                continue
+            count = min(self.max_batch - size, len(request.texts) - request.taken)
+            batch.append((request, request.texts[request.taken:request.taken + count]))
+            request.taken += count
+            size += count
+            if request.taken < len(request.texts):
+                active.append(request)
+        return batch
+
+    def _run(self, batch: List[Tuple[_Request, List[str]]]):
+        # Identical texts from different callers are encoded once
+        unique = {}
+        for _, texts in batch:
+            for text in texts:
+                unique.setdefault(text, len(unique))
+        try:
+            embeddings = self._encode(list(unique)) if unique else None
+        except BaseException as e:
+            for request, _ in batch:
+                self._fail(request, e)
+            return
+        if unique:
+            self.batches += 1
+            self.texts += len(unique)
+        for request, texts in batch:
+            if texts:
+                request.rows.append(embeddings[[unique[text] for text in texts]])
+            if request.taken == len(request.texts) and not request.future.done():
+                if request.rows:
+                    request.future.set_result(np.concatenate(request.rows))
+                else:
+                    request.future.set_result(np.zeros((0, 0), dtype=np.float32))
+
+    @staticmethod
+    def _fail(request: _Request, error: BaseException):
+        # The request's remaining slices are skipped once its future is done
+        if not request.future.done():
+            request.future.set_exception(error)
+
+def batcher_from_config(config, encode: Callable[[List[str]], np.ndarray]
+                        ) -> Optional[EmbeddingBatcher]:
+    """Build the EmbeddingBatcher described by config's embedding_service
+    section, or None when it is disabled."""
+    if not config.get("embedding_service.enabled", False):
+        return None
+    return EmbeddingBatcher(
+        encode,
+        max_batch=int(config.get("embedding_service.max_batch", 32)),
+        max_latency_ms=float(config.get("embedding_service.max_latency_ms", 10)),
+    )
@@ -1,102 +1,348 @@
-from typing import Dict, List, Set, Tuple, Optional
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Sequence, Set, Tuple, Optional
+import json
 import re
+import threading
+import time
 
-# spaCy is optional; fallback to regex if not available
-try:
-    import spacy
-    _NLP = spacy.load("en_core_web_sm")
-except Exception:
-    _NLP = None
-
+from src.caching import LRUCache, text_digest
 from src.skills_db import SKILL_SYNONYMS, CANONICAL_SKILLS, ALL_SKILL_TERMS, EDUCATION_LEVELS, SENIORITY_KEYWORDS
 
+# spaCy is optional and only loaded the first time organizations are
+# requested; fallback to regex if disabled or not available
+_NER_SETTINGS = {
+    "enabled": True,
+    "model": "en_core_web_sm",
+    "n_process": 1,
+    "batch_size": 32,
+}
+# ORG entities only need the NER component (and the tok2vec or transformer
+# it may listen to); the other components of spaCy's trained pipelines are
+# excluded at load time so they are never built or kept in memory
+_EXCLUDED_PIPES = ["tagger", "morphologizer", "parser", "senter", "attribute_ruler",
+                   "lemmatizer", "trainable_lemmatizer", "textcat", "textcat_multilabel"]
+_NLP = None
+_NLP_LOADED = False
+# Serializes the lazy load, so concurrent first users load spaCy only once
+_NLP_LOCK = threading.Lock()
+
+# Bump whenever extraction logic changes, so persisted entities
+# (see src/extraction_cache.py) are recomputed rather than reused
+EXTRACTOR_VERSION = 1
+
+_FINGERPRINT: Optional[str] = None
+
+def extractor_fingerprint() -> str:
+    """Digest of EXTRACTOR_VERSION and the vocabularies extraction matches
+    against; entities stored under a different fingerprint are stale.
+
+    Computed once and recomputed after refresh_skill_matcher().
+    """
+    global _FINGERPRINT
+    if _FINGERPRINT is None:
+        vocabulary = json.dumps([SKILL_SYNONYMS, EDUCATION_LEVELS, SENIORITY_KEYWORDS],
+                                sort_keys=True, default=sorted)
+        _FINGERPRINT = text_digest(vocabulary, str(EXTRACTOR_VERSION))
+    return _FINGERPRINT
+
+_WORD_CHAR = re.compile(r"\w")
+
 def _normalize(text: str) -> str:
     return text.lower()
 
+def _trie_regex(terms: Iterable[str]) -> str:
+    """Build a regex matching any of terms, factored by common prefix so the
+    engine does one character walk per text position instead of one
+    attempt per term. Greedy optional groups prefer the longest term."""
+    trie: Dict[str, dict] = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return ("(?:" + body + ")" if len(branches) == 1 else body) + "?"
+        return body
+
+    return build(trie)
+
+def _boundary_at(term: str, i: int) -> bool:
+    # Equivalent of regex \b between term[i - 1] and term[i]
+    return bool(_WORD_CHAR.match(term[i - 1])) != bool(_WORD_CHAR.match(term[i]))
+
+class TermMatcher:
+    """Find which labels have a whole-word term in a text, in one regex scan.
+
+    ``vocabulary`` maps a label to its terms (the shape of SKILL_SYNONYMS).
+    The result is identical to running ``re.search(rf"\\b{term}\\b")`` for
+    every term: the scan finds the longest whole-word term at each offset,
+    and shorter terms that are whole-word prefixes of it are added from a
+    table precomputed at build time.
+    """
+
+    def __init__(self, vocabulary: Dict[str, Iterable[str]]):
+        self.labels: Dict[str, List[str]] = {}
+        for label, terms in vocabulary.items():
+            for term in terms:
+                if term:
+                    self.labels.setdefault(term, [])
+                    if label not in self.labels[term]:
+                        self.labels[term].append(label)
+        self._implied: Dict[str, List[str]] = {
+            term: [term[:i] for i in range(1, len(term))
+                   if term[:i] in self.labels and _boundary_at(term, i)]
+            for term in self.labels
+        }
+        self._pattern = (
+            re.compile(rf"(?=\b({_trie_regex(self.labels)})\b)") if self.labels else None
+        )
+
+    def find_terms(self, normalized_text: str) -> Set[str]:
+        found: Set[str] = set()
+        if self._pattern is None:
+            return found
+        for m in self._pattern.finditer(normalized_text):
+            term = m.group(1)
+            if term not in found:
+                found.add(term)
+                found.update(self._implied[term])
+        return found
+
+    def find_labels(self, normalized_text: str) -> Set[str]:
+        return {label for term in self.find_terms(normalized_text) for label in self.labels[term]}
+
+_SKILL_MATCHER: Optional[TermMatcher] = None
+
+def get_skill_matcher() -> TermMatcher:
+    """Return the compiled matcher for SKILL_SYNONYMS, building it on first use."""
+    global _SKILL_MATCHER
+    if _SKILL_MATCHER is None:
+        _SKILL_MATCHER = TermMatcher(SKILL_SYNONYMS)
+    return _SKILL_MATCHER
+
+def refresh_skill_matcher() -> None:
+    """Drop the compiled matcher; call after changing SKILL_SYNONYMS.
+
+    The extractor fingerprint changes with it, so entities memoized under
+    the old vocabulary are no longer returned.
+    """
+    global _SKILL_MATCHER, _FINGERPRINT
+    _SKILL_MATCHER = None
+    _FINGERPRINT = None
+
 def extract_skills(text: str) -> List[str]:
     t = _normalize(text)
-    found: Set[str] = set()
     # Match any synonym term as a whole word
-    for canonical, terms in SKILL_SYNONYMS.items():
-        for term in terms:
-            if re.search(rf"\b{re.escape(term)}\b", t):
-                found.add(canonical)
-                break
-    return sorted(found)
+    return sorted(get_skill_matcher().find_labels(t))
 
-def extract_experience_years(text: str) -> int:
-    t = _normalize(text)
-    years = 0
-    
+# Experience patterns, compiled once. "X years of experience" phrasing is
+# not scanned separately: every such match is also a _YEARS_RE match.
+_YEARS_RE = re.compile(r"(\d{1,2})\s*\+?\s*(?:years|year|yrs|yr)\b")
+_EXPERIENCE_YEARS_RES = (
+    # "experience ... X years"
+    re.compile(r"experience.{0,30}(\d{1,2})\s*\+?\s*(?:years|year|yrs|yr)"),
+    # "X years ... experience"
+    re.compile(r"(\d{1,2})\s*\+?\s*(?:years|year|yrs|yr).{0,30}experience"),
+)
+
+_SENIORITY_ORDER = ["senior", "mid", "entry", "intern"]  # prioritize senior if multiple found
+_SENIORITY_MATCHER = TermMatcher(SENIORITY_KEYWORDS)
+_EDUCATION_MATCHER = TermMatcher({level: [level] for level in EDUCATION_LEVELS})
+
+def _experience_years(t: str) -> int:
     # Pattern examples: "5+ years", "3 years", "2 yrs", "7+ yrs"
-    for m in re.findall(r"(\d{1,2})\s*\+?\s*(?:years|year|yrs|yr)\b", t):
-        try:
-            years = max(years, int(m))
-        except ValueError:
-            continue
-            
-    # Sometimes "X years of experience in ..." phrasing
-    for m in re.findall(r"(\d{1,2})\s*\+?\s*years? of experience", t):
-        try:
-            years = max(years, int(m))
-        except ValueError:
-            continue
-    
-    # Additional pattern: "experience ... X years"
-    for m in re.findall(r"experience.{0,30}(\d{1,2})\s*\+?\s*(?:years|year|yrs|yr)", t):
-        try:
-            years = max(years, int(m))
-        except ValueError:
-            continue
-            
-    # Additional pattern: "X years ... experience"
-    for m in re.findall(r"(\d{1,2})\s*\+?\s*(?:years|year|yrs|yr).{0,30}experience", t):
-        try:
-            years = max(years, int(m))
-        except ValueError:
-            continue
-    
+    years = max((int(m) for m in _YEARS_RE.findall(t)), default=0)
+    if "experience" in t:
+        for pattern in _EXPERIENCE_YEARS_RES:
+            years = max(years, max((int(m) for m in pattern.findall(t)), default=0))
     return years
 
-def detect_seniority(text: str) -> Optional[str]:
-    t = _normalize(text)
-    order = ["intern", "entry", "mid", "senior"]
-    for level in reversed(order):  # prioritize senior if multiple found
-        for kw in SENIORITY_KEYWORDS[level]:
-            if re.search(rf"\b{re.escape(kw)}\b", t):
-                return level
+def _seniority(t: str) -> Optional[str]:
+    found = _SENIORITY_MATCHER.find_labels(t)
+    for level in _SENIORITY_ORDER:
+        if level in found:
+            return level
     return None
 
-def extract_education_level(text: str) -> Optional[str]:
-    t = _normalize(text)
+def _education_level(t: str) -> Optional[str]:
+    found = _EDUCATION_MATCHER.find_labels(t)
     best_level = None
     best_score = -1
     for level, score in EDUCATION_LEVELS.items():
-        if re.search(rf"\b{re.escape(level)}\b", t):
-            if score > best_score:
-                best_level = level
-                best_score = score
+        if level in found and score > best_score:
+            best_level = level
+            best_score = score
     return best_level
 
-def extract_entities(text: str) -> Dict:
-    # Optional spaCy usage to augment extraction (titles, orgs)
-    orgs = set()
-    if _NLP:
-        try:
-            doc = _NLP(text)
-            orgs = {ent.text for ent in doc.ents if ent.label_ == "ORG"}
-        except Exception:
-            orgs = set()
-
-    skills = extract_skills(text)
-    years = extract_experience_years(text)
-    seniority = detect_seniority(text)
-    education = extract_education_level(text)
-
-    return {
-        "skills": skills,
-        "experience_years": years,
-        "seniority": seniority,
-        "education": education,
-        "organizations": sorted(orgs),
-    }
\ No newline at end of file
+def extract_experience_years(text: str) -> int:
+    return _experience_years(_normalize(text))
+
+def detect_seniority(text: str) -> Optional[str]:
+    return _seniority(_normalize(text))
+
+def extract_education_level(text: str) -> Optional[str]:
+    return _education_level(_normalize(text))
+
+@dataclass
+class ExtractedEntities:
+    """Structured fields extracted from one resume or job description.
+
+    ``timings`` holds seconds spent per stage when extraction ran with
+    ``timed=True``; it is not part of ``to_dict()``.
+    """
+
+    skills: List[str]
+    experience_years: int
+    seniority: Optional[str]
+    education: Optional[str]
+    organizations: List[str] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict:
+        return {
+            "skills": self.skills,
+            "experience_years": self.experience_years,
+            "seniority": self.seniority,
+            "education": self.education,
+            "organizations": self.organizations,
+        }
+
+def configure_ner(enabled: Optional[bool] = None, model: Optional[str] = None,
+                  n_process: Optional[int] = None, batch_size: Optional[int] = None) -> None:
+    """Change spaCy NER settings; the model is (re)loaded lazily on next use."""
+    global _NLP, _NLP_LOADED
+    with _NLP_LOCK:
+        for key, value in (("enabled", enabled), ("model", model),
+                           ("n_process", n_process), ("batch_size", batch_size)):
+            if value is not None:
+                _NER_SETTINGS[key] = value
+        _NLP_LOADED = False
+        _NLP = None
+
+def configure_ner_from_config(config) -> None:
+    """Apply the ``ner`` and ``spacy_model`` settings of a Config."""
+    configure_ner(
+        enabled=config.get("ner.enabled"),
+        model=config.get("spacy_model"),
+        n_process=config.get("ner.n_process"),
+        batch_size=config.get("ner.batch_size"),
+    )
+
+def _get_nlp():
+    global _NLP, _NLP_LOADED
+    if _NLP_LOADED:
+        return _NLP
+    with _NLP_LOCK:
+        if not _NLP_LOADED:
+            nlp = None
+            if _NER_SETTINGS["enabled"]:
+                try:
+                    import spacy
+                    nlp = spacy.load(_NER_SETTINGS["model"], exclude=_EXCLUDED_PIPES)
+                except Exception:
+                    nlp = None
+            # Publish the pipeline before the flag that lets readers skip the lock
+            _NLP = nlp
+            _NLP_LOADED = True
+        return _NLP
+
+def extract_organizations(texts: Sequence[str], n_process: Optional[int] = None,
+                          batch_size: Optional[int] = None) -> List[List[str]]:
+    """Return the sorted ORG entities of each text, running spaCy in batches.
+
+    Returns empty lists when NER is disabled or spaCy is unavailable.
+    """
+    texts = list(texts)
+    nlp = _get_nlp()
+    if nlp is None:
+        return [[] for _ in texts]
+    try:
+        docs = nlp.pipe(
+            texts,
+            n_process=n_process or _NER_SETTINGS["n_process"],
+            batch_size=batch_size or _NER_SETTINGS["batch_size"],
+        )
+        return [sorted({ent.text for ent in doc.ents if ent.label_ == "ORG"}) for doc in docs]
+    except Exception:
+        return [[] for _ in texts]
+
+def run_extraction(text: str, include_organizations: bool = False,
+                   timed: bool = False) -> ExtractedEntities:
+    """Extract every entity type from text, lowercasing it only once.
+
+    Organizations need spaCy and are only extracted when requested. With
+    ``timed=True`` the per-stage durations are recorded in
+    ``ExtractedEntities.timings`` to show which extractor dominates.
+    """
+    timings: Dict[str, float] = {}
+    clock = time.perf_counter if timed else None
+
+    def stage(name, fn, arg):
+        if clock is None:
+            return fn(arg)
+        start = clock()
+        result = fn(arg)
+        timings[name] = clock() - start
+        return result
+
+    t = stage("normalize", _normalize, text)
+    return ExtractedEntities(
+        skills=stage("skills", lambda s: sorted(get_skill_matcher().find_labels(s)), t),
+        experience_years=stage("experience", _experience_years, t),
+        seniority=stage("seniority", _seniority, t),
+        education=stage("education", _education_level, t),
+        organizations=(
+            stage("organizations", lambda s: extract_organizations([s])[0], text)
+            if include_organizations else []
+        ),
+        timings=timings,
+    )
+
+def run_extraction_batch(texts: Sequence[str], include_organizations: bool = False,
+                         timed: bool = False) -> List[ExtractedEntities]:
+    """run_extraction over many texts, with organizations found in one
+    batched ``nlp.pipe`` pass instead of one spaCy call per text."""
+    texts = list(texts)
+    results = [run_extraction(text, timed=timed) for text in texts]
+    if include_organizations:
+        start = time.perf_counter()
+        for ents, orgs in zip(results, extract_organizations(texts)):
+            ents.organizations = orgs
+        if timed and results:
+            share = (time.perf_counter() - start) / len(results)
+            for ents in results:
+                ents.timings["organizations"] = share
+    return results
+
+def extract_entities(text: str, include_organizations: bool = False) -> Dict:
+    return run_extraction(text, include_organizations=include_organizations).to_dict()
+
+def extract_entities_batch(texts: Sequence[str], include_organizations: bool = False) -> List[Dict]:
+    return [ents.to_dict() for ents in run_extraction_batch(texts, include_organizations)]
+
+_ENTITY_CACHE = LRUCache(maxsize=4096)
+
+def get_resume_entities(text: str) -> ExtractedEntities:
+    """run_extraction memoized by text hash and extractor fingerprint, so a
+    resume ranked against many jobs is only parsed once. Treat the result
+    as read-only."""
+    key = (extractor_fingerprint(), text_digest(text))
+    ents = _ENTITY_CACHE.get(key)
+    if ents is None:
+        ents = run_extraction(text)
+        _ENTITY_CACHE.put(key, ents)
+    return ents
+
+def attach_entities(resumes: List[Dict]) -> List[Dict]:
+    """Store each resume's extracted entities under its 'entities' key
+    (if not already present) and return the same list."""
+    for resume in resumes:
+        if resume.get("entities") is None:
+            resume["entities"] = get_resume_entities(resume["text"])
+    return resumes
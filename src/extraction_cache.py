@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from typing import Dict, Iterable, Optional, Tuple
+
+from src.entity_extractor import extractor_fingerprint, run_extraction
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def file_fingerprint(path: str) -> Tuple[int, int, str]:
+    """(size, mtime_ns, sha256) of a file, taken together before it is read."""
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns, file_digest(path)
+
+def _options_key(options: Optional[Dict]) -> str:
+    # Canonical form, so {} / None and key order don't matter
+    return json.dumps({k: v for k, v in (options or {}).items() if v is not None}, sort_keys=True)
+
+class ExtractionManifest:
+    """Persistent record of cleaned resume text keyed by file path.
+
+    An entry is reused while the file's size and mtime are unchanged; if
+    only the mtime moved (e.g. the file was copied or touched) the content
+    hash decides. Text is stored zlib-compressed in a SQLite database in
+    WAL mode, so several processes can read and update it concurrently.
+    With ``with_entities=True`` the extracted entities are stored as well,
+    tagged with the extractor fingerprint; entries recorded under another
+    extractor version or vocabulary are misses. So are entries extracted
+    with different options (e.g. max_pages / max_chars caps).
+    """
+
+    def __init__(self, db_path: str, with_entities: bool = False):
+        self.db_path = db_path
+        self.with_entities = with_entities
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                text BLOB NOT NULL,
+                entities TEXT,
+                entities_version TEXT,
+                options TEXT
+            )
+        """)
+        self.entities_version = extractor_fingerprint() if with_entities else None
+
+    def close(self):
+        self._conn.close()
+
+    def lookup(self, path: str, options: Optional[Dict] = None) -> Optional[Dict]:
+        """Return {'text', 'entities'} for an unchanged file extracted with
+        the same ``options``, else None (also when the file can't be
+        stat'ed; extracting it then reports the error)."""
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, content_hash, text, entities, entities_version, options "
+                "FROM files WHERE path = ?",
+                (path,),
+            ).fetchone()
+        if row is None or row[0] != st.st_size:
+            return None
+        size, mtime_ns, content_hash, text, entities, entities_version, stored_options = row
+        if stored_options != _options_key(options):
+            return None
+        if self.with_entities and (entities is None or entities_version != self.entities_version):
+            return None
+        if mtime_ns != st.st_mtime_ns:
+            try:
+                if file_digest(path) != content_hash:
+                    return None
+            except OSError:
+                return None
+            with self._lock:
+                self._conn.execute("UPDATE files SET mtime_ns = ? WHERE path = ?",
+                                   (st.st_mtime_ns, path))
+        return {
+            "text": zlib.decompress(text).decode("utf-8"),
+            "entities": json.loads(entities) if entities else None,
+        }
+
+    def store(self, path: str, text: str,
+              fingerprint: Optional[Tuple[int, int, str]] = None,
+              options: Optional[Dict] = None) -> Optional[Dict]:
+        """Record a freshly extracted file; returns its entities dict when
+        the manifest stores entities, else None.
+
+        ``fingerprint`` is the file_fingerprint() taken *before* the text
+        was extracted; pass it so a file edited during extraction is not
+        recorded with new metadata but old text. Without it the file is
+        fingerprinted now. ``options`` are the extraction options the text
+        was produced with; lookups with other options miss.
+        """
+        path = os.path.abspath(path)
+        size, mtime_ns, content_hash = fingerprint or file_fingerprint(path)
+        entities = run_extraction(text).to_dict() if self.with_entities else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files "
+                "(path, size, mtime_ns, content_hash, text, entities, entities_version, options) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, size, mtime_ns, content_hash,
+                 zlib.compress(text.encode("utf-8")),
+                 json.dumps(entities) if entities is not None else None,
+                 self.entities_version, _options_key(options)),
+            )
+        return entities
+
+    def prune(self, directory: str, present: Iterable[str]):
+        """Forget files of ``directory`` that are not in ``present``."""
+        directory = os.path.join(os.path.abspath(directory), "")
+        keep = {os.path.abspath(path) for path in present}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path FROM files WHERE substr(path, 1, ?) = ?",
+                (len(directory), directory),
+            ).fetchall()
+            stale = [(path,) for (path,) in rows
+                     if path not in keep and os.path.dirname(path) == directory[:-1]]
+            if stale:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.executemany("DELETE FROM files WHERE path = ?", stale)
+                self._conn.execute("COMMIT")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
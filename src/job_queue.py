@@ -0,0 +1,139 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from src.resume_processor import clean_text, extract_text
+from src.screening import screen
+
+# Pipeline stages reported by a job, in the order they run
+STAGES = ("extract", "entities", "embed", "rank")
+
+class QueueFull(Exception):
+    """Raised by ScreeningQueue.submit when no job slot is free."""
+
+@dataclass
+class ScreeningJob:
+    """State of one queued screening run, as reported to pollers."""
+    id: str
+    job_description: str
+    status: str = "queued"  # queued -> running -> done | failed
+    progress: Dict[str, Dict[str, int]] = field(
+        default_factory=lambda: {stage: {"done": 0, "total": 0} for stage in STAGES})
+    errors: List[Dict[str, str]] = field(default_factory=list)
+    results: Optional[List[Dict]] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        """Status summary (without the results themselves)."""
+        return {
+            "id": self.id,
+            "status": self.status,
+            "progress": {stage: dict(counts) for stage, counts in self.progress.items()},
+            "errors": list(self.errors),
+            "error": self.error,
+            "result_count": len(self.results) if self.results is not None else None,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+class ScreeningQueue:
+    """In-process job queue running screen() on a bounded thread pool.
+
+    At most ``workers`` jobs run at once and at most ``max_pending`` more
+    wait for a worker; submit() raises QueueFull beyond that instead of
+    buffering without limit, so callers can push back on clients. The
+    ``keep_finished`` most recent finished jobs are kept for polling.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 8, keep_finished: int = 100,
+                 min_score: Optional[float] = None):
+        self.min_score = min_score
+        self.keep_finished = keep_finished
+        self._executor = ThreadPoolExecutor(max_workers=workers,
+                                            thread_name_prefix="screening")
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, ScreeningJob]" = OrderedDict()
+
+    def submit(self, uploads: List[Tuple[str, BinaryIO]], job_description: str) -> ScreeningJob:
+        """Queue (filename, binary stream) uploads for screening.
+
+        The streams are owned by the queue from here on and closed once
+        their text is extracted.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise QueueFull("screening queue is full")
+        job = ScreeningJob(id=uuid.uuid4().hex, job_description=job_description)
+        job.progress["extract"]["total"] = len(uploads)
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._executor.submit(self._run, job, uploads)
+        except Exception:
+            # e.g. after shutdown(): don't leave a job that will never run
+            with self._lock:
+                self._jobs.pop(job.id, None)
+            self._slots.release()
+            raise
+        return job
+
+    def get(self, job_id: str) -> Optional[ScreeningJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def results_page(self, job_id: str, offset: int = 0,
+                     limit: int = 50) -> Optional[List[Dict]]:
+        """Ranked results [offset, offset + limit) of a finished job, else None."""
+        job = self.get(job_id)
+        if job is None or job.results is None:
+            return None
+        return job.results[offset:offset + limit]
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job: ScreeningJob, uploads: List[Tuple[str, BinaryIO]]):
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            resumes = []
+            for i, (filename, stream) in enumerate(uploads):
+                try:
+                    text = extract_text(stream, filename=filename)
+                    resumes.append({"text": clean_text(text), "filename": filename})
+                except Exception as e:
+                    job.errors.append({"filename": filename, "error": str(e) or type(e).__name__})
+                finally:
+                    stream.close()
+                job.progress["extract"]["done"] = i + 1
+            job.results = screen(resumes, job.job_description, min_score=self.min_score,
+                                 progress=lambda stage, done, total: self._report(job, stage, done, total))
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e) or type(e).__name__
+            job.status = "failed"
+        finally:
+            for _, stream in uploads:
+                stream.close()
+            job.finished_at = time.time()
+            self._slots.release()
+            self._forget_old()
+
+    @staticmethod
+    def _report(job: ScreeningJob, stage: str, done: int, total: int):
+        job.progress[stage] = {"done": done, "total": total}
+
+    def _forget_old(self):
+        with self._lock:
+            finished = [job_id for job_id, job in self._jobs.items()
+                        if job.status in ("done", "failed")]
+            for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+                del self._jobs[job_id]
@@ -1,9 +1,19 @@
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, Sequence
+import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
 
+from src.candidate_ranker import select_top
+
 # Lazy-load the sentence transformer model to speed startup
 _model = None
 MODEL_NAME = "all-MiniLM-L6-v2"
+DEFAULT_BATCH_SIZE = 32
+
+# Optional persistent embedding cache (see src/embedding_cache.py)
+_cache = None
+
+# Optional cross-request micro-batcher (see src/embedding_service.py)
+_batcher = None
 
 def _ensure_model():
     global _model
@@ -12,40 +22,174 @@ def _ensure_model():
         _model = SentenceTransformer(MODEL_NAME)
     return _model
 
+def set_embedding_cache(cache) -> None:
+    """Install (or remove, with None) the cache consulted before encoding."""
+    global _cache
+    _cache = cache
+
+def get_embedding_cache():
+    return _cache
+
+def set_embedding_batcher(batcher) -> None:
+    """Route model calls through a shared EmbeddingBatcher (None: call the
+    model directly from each caller's thread)."""
+    global _batcher
+    _batcher = batcher
+
+def get_embedding_batcher():
+    return _batcher
+
+def encode_texts(texts: Sequence[str]) -> np.ndarray:
+    """Encode texts with the model itself, bypassing cache and batcher."""
+    return _encode_batched(texts, DEFAULT_BATCH_SIZE)
+
 def get_embedding(text: str):
+    return get_embeddings([text])[0]
+
+def get_embeddings(texts: Sequence[str], batch_size: int = DEFAULT_BATCH_SIZE) -> np.ndarray:
+    """Encode many texts with as few model calls as possible.
+
+    Cached vectors are reused when an embedding cache is installed; only
+    the misses reach the model and are written back to the cache. With an
+    embedding batcher installed, the model call is shared with other
+    threads' pending requests.
+    """
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    cache = _cache
+    if cache is None:
+        return _encode(texts, batch_size)
+
+    found, missing = cache.get_many(texts)
+    encoded: Optional[np.ndarray] = None
+    if missing:
+        encoded = _encode([texts[i] for i in missing], batch_size)
+        cache.put_many([texts[i] for i in missing], encoded)
+    dim = encoded.shape[1] if encoded is not None else next(iter(found.values())).shape[0]
+    embeddings = np.empty((len(texts), dim), dtype=np.float32)
+    for i, vector in found.items():
+        embeddings[i] = vector
+    if encoded is not None:
+        embeddings[missing] = encoded
+    return embeddings
+
+def _encode(texts: Sequence[str], batch_size: int) -> np.ndarray:
+    batcher = _batcher
+    if batcher is not None:
+        return batcher.encode(texts)
+    return _encode_batched(texts, batch_size)
+
+def _encode_batched(texts: Sequence[str], batch_size: int) -> np.ndarray:
+    """Encode texts sorted by length so each batch pads to a similar
+    sequence length; rows are returned in the original order."""
     model = _ensure_model()
-    return model.encode([text])[0]
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    embeddings = None
+    for start in range(0, len(order), batch_size):
+        idx = order[start:start + batch_size]
+        batch = model.encode([texts[i] for i in idx], batch_size=batch_size)
+        if embeddings is None:
+            embeddings = np.empty((len(texts), batch.shape[1]), dtype=batch.dtype)
+        embeddings[idx] = batch
+    return embeddings
 
-def match_resumes_to_jobs(resumes, job_description: str) -> List[Dict]:
+def _resume_fields(resume):
+    # Handle both string inputs and dictionary inputs
+    if isinstance(resume, dict) and "text" in resume:
+        return resume["text"], resume.get("filename", "Unknown")
+    return resume, "Resume"
+
+def match_resumes_to_jobs(resumes, job_description: str,
+                          batch_size: int = DEFAULT_BATCH_SIZE) -> List[Dict]:
     """Match resumes to job description using semantic similarity.
-    
+
     Args:
         resumes: Either a list of strings or a list of dictionaries with 'text' key
         job_description: The job description text
-        
+        batch_size: Number of resumes encoded per model call
+
     Returns:
         List of dictionaries with similarity scores
     """
-    job_emb = get_embedding(job_description)
-    results: List[Dict] = []
-    
-    for resume in resumes:
-        # Handle both string inputs and dictionary inputs
-        if isinstance(resume, dict) and "text" in resume:
-            resume_text = resume["text"]
-            resume_name = resume.get("filename", "Unknown")
-        else:
-            resume_text = resume
-            resume_name = "Resume"
-            
-        res_emb = get_embedding(resume_text)
-        score = float(cosine_similarity([res_emb], [job_emb])[0][0]) * 100.0
-        
-        results.append(
-            {
-                "filename": resume_name,  # Use consistent key name across the application
-                "similarity": round(score, 2),
-                "text": resume_text,
+    return match_resumes_to_many_jobs(resumes, [job_description], batch_size=batch_size)[0]
+
+def similarity_matrix(job_descriptions: Sequence[str], resume_texts: Sequence[str],
+                      batch_size: int = DEFAULT_BATCH_SIZE,
+                      progress: Optional[Callable[[int, int], None]] = None) -> np.ndarray:
+    """Return the jobs × resumes cosine similarity matrix on a 0..100 scale.
+
+    Every job and every resume is embedded exactly once, however many
+    pairs are scored. With ``progress``, resumes are encoded a few batches
+    at a time and progress(done, total) is called after each chunk.
+    """
+    if not job_descriptions or not resume_texts:
+        return np.zeros((len(job_descriptions), len(resume_texts)))
+    job_embs = get_embeddings(job_descriptions, batch_size=batch_size)
+    if progress is None:
+        res_embs = get_embeddings(resume_texts, batch_size=batch_size)
+    else:
+        chunk = batch_size * 4
+        parts = []
+        for start in range(0, len(resume_texts), chunk):
+            parts.append(get_embeddings(resume_texts[start:start + chunk], batch_size=batch_size))
+            progress(min(start + chunk, len(resume_texts)), len(resume_texts))
+        res_embs = np.vstack(parts)
+    return cosine_similarity(job_embs, res_embs) * 100.0
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indexes of the k best columns of each row, best first.
+
+    Each row is cut with select_top(), so only the selected k entries are
+    sorted and ties at the k-th score keep the earliest columns.
+    """
+    k = max(0, min(k, scores.shape[1]))
+    if scores.shape[0] == 0:
+        return np.zeros((0, k), dtype=np.intp)
+    return np.stack([select_top(row, top_k=k) for row in scores])
+
+def match_resumes_to_many_jobs(resumes, job_descriptions: Sequence[str],
+                               top_k: Optional[int] = None,
+                               batch_size: int = DEFAULT_BATCH_SIZE) -> List[List[Dict]]:
+    """Match every resume against every job description in one pass.
+
+    Args:
+        resumes: Either a list of strings or a list of dictionaries with 'text'
+            key (and optionally an 'id' and precomputed 'entities', which are
+            passed through)
+        job_descriptions: The job description texts
+        top_k: Keep only the k most similar resumes per job (best first);
+            None keeps all resumes in input order, like match_resumes_to_jobs
+        batch_size: Number of texts encoded per model call
+
+    Returns:
+        One list of match dicts (same format as match_resumes_to_jobs) per job
+    """
+    fields = [_resume_fields(resume) for resume in resumes]
+    matrix = similarity_matrix(job_descriptions, [text for text, _ in fields],
+                               batch_size=batch_size)
+    if top_k is None:
+        selected = np.tile(np.arange(len(fields)), (len(job_descriptions), 1))
+    else:
+        selected = top_k_indices(matrix, top_k)
+
+    # Carry precomputed entities (and stable IDs) through so ranking doesn't
+    # re-extract them and callers can join results back without comparing text
+    entities = [resume.get("entities") if isinstance(resume, dict) else None for resume in resumes]
+    ids = [resume.get("id") if isinstance(resume, dict) else None for resume in resumes]
+
+    all_results: List[List[Dict]] = []
+    for row, indexes in zip(matrix.tolist(), selected.tolist()):
+        job_results = []
+        for i in indexes:
+            result = {
+                "filename": fields[i][1],
+                "similarity": round(row[i], 2),
+                "text": fields[i][0],
             }
-        )
-    return results
\ No newline at end of file
+            if ids[i] is not None:
+                result["id"] = ids[i]
+            if entities[i] is not None:
+                result["entities"] = entities[i]
+            job_results.append(result)
+        all_results.append(job_results)
+    return all_results
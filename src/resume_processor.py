@@ -1,76 +1,350 @@
+import io
 import os
 import re
-from typing import Dict, List, Optional
+import signal
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
 import docx
 import PyPDF2
 
+from src.entity_extractor import ExtractedEntities
+from src.extraction_cache import file_fingerprint
+
 ALLOWED_EXTENSIONS = {".pdf", ".docx", ".txt"}
 
-def extract_text_from_pdf(file_path: str) -> str:
-    text = ""
+# Extra seconds the parent waits for a worker past its own timeout before
+# giving up on it (the worker's alarm should have fired long before)
+_TIMEOUT_SLACK = 5.0
+
+# A file path, raw file bytes, or a readable binary stream (e.g. an upload)
+ResumeSource = Union[str, os.PathLike, bytes, BinaryIO]
+
+@contextmanager
+def _binary_stream(source: ResumeSource) -> Iterator[BinaryIO]:
+    """Yield a readable binary stream for a path, bytes or file-like object.
+
+    Paths are opened (and closed afterwards); streams are used as-is and
+    left open for the caller.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source)
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            yield f
+    else:
+        yield source
+
+def iter_pdf_pages(source: ResumeSource, max_pages: Optional[int] = None) -> Iterator[str]:
+    """Yield the text of each PDF page as it is extracted.
+
+    Pages are parsed lazily, so consumers can process (or stop after) early
+    pages without paying for the rest of the document. Errors propagate.
+    """
+    with _binary_stream(source) as f:
+        reader = PyPDF2.PdfReader(f)
+        for i, page in enumerate(reader.pages):
+            if max_pages is not None and i >= max_pages:
+                return
+            yield page.extract_text() or ""
+
+def extract_text_from_pdf(source: ResumeSource, max_pages: Optional[int] = None,
+                          max_chars: Optional[int] = None, strict: bool = False) -> str:
+    parts: List[str] = []
+    total = 0
     try:
-        with open(file_path, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-            for page in reader.pages:
-                page_text = page.extract_text() or ""
-                text += page_text + "\n"
+        for page_text in iter_pdf_pages(source, max_pages=max_pages):
+            parts.append(page_text + "\n")
+            total += len(parts[-1])
+            if max_chars is not None and total >= max_chars:
+                break
     except Exception:
+        if strict:
+            raise
         # Gracefully degrade
         return ""
-    return text
+    # Join once instead of growing a string page by page
+    text = "".join(parts)
+    return text[:max_chars] if max_chars is not None else text
 
-def extract_text_from_docx(file_path: str) -> str:
+def extract_text_from_docx(source: ResumeSource, strict: bool = False) -> str:
     try:
-        doc = docx.Document(file_path)
+        with _binary_stream(source) as f:
+            doc = docx.Document(f)
         return "\n".join([p.text for p in doc.paragraphs])
     except Exception:
+        if strict:
+            raise
         return ""
 
-def extract_text_from_txt(file_path: str) -> str:
+def extract_text_from_txt(source: ResumeSource, strict: bool = False) -> str:
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            return f.read()
-    except UnicodeDecodeError:
-        with open(file_path, "r", encoding="latin-1") as f:
-            return f.read()
+        with _binary_stream(source) as f:
+            raw = f.read()
     except Exception:
+        if strict:
+            raise
         return ""
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return raw.decode("latin-1")
 
-def extract_text(file_path: str) -> str:
-    ext = os.path.splitext(file_path)[1].lower()
+def extract_text(source: ResumeSource, max_pages: Optional[int] = None,
+                 max_chars: Optional[int] = None, filename: Optional[str] = None,
+                 strict: bool = False) -> str:
+    """Extract text by file extension; max_pages (PDF only) and max_chars
+    cap how much of a long document is read.
+
+    ``source`` may be a path, the file's bytes or a binary stream; for the
+    latter two pass ``filename`` so the format can be told from its
+    extension. Nothing is written to disk. Unreadable files yield "" unless
+    ``strict``, in which case the parser's exception propagates.
+    """
+    if filename is None:
+        filename = os.fspath(source) if isinstance(source, (str, os.PathLike)) else ""
+    ext = os.path.splitext(filename)[1].lower()
     if ext == ".pdf":
-        return extract_text_from_pdf(file_path)
+        return extract_text_from_pdf(source, max_pages=max_pages, max_chars=max_chars,
+                                     strict=strict)
     if ext == ".docx":
-        return extract_text_from_docx(file_path)
-    if ext == ".txt":
-        return extract_text_from_txt(file_path)
-    return ""
+        text = extract_text_from_docx(source, strict=strict)
+    elif ext == ".txt":
+        text = extract_text_from_txt(source, strict=strict)
+    else:
+        return ""
+    return text[:max_chars] if max_chars is not None else text
+
+# Any run of whitespace, control or non-ASCII characters
+_NON_PRINTABLE_RUN = re.compile(r"[^\x21-\x7E]+")
 
 def clean_text(text: str) -> str:
-    # Preserve emails, phones, and punctuation while normalizing whitespace
-    text = re.sub(r"\r\n|\r|\n", " ", text)
-    text = re.sub(r"\s+", " ", text)
-    # Remove excessive non-printable characters
-    text = re.sub(r"[^\x09\x0A\x0D\x20-\x7E]", " ", text)
-    return text.strip()
-
-def load_resumes(directory: str) -> List[Dict[str, str]]:
+    # Preserve emails, phones, and punctuation while normalizing whitespace.
+    # One pass: line breaks, whitespace and non-printable characters all
+    # collapse into a single space, so no run of spaces is left behind.
+    return _NON_PRINTABLE_RUN.sub(" ", text).strip()
+
+class ExtractionTimeout(BaseException):
+    """Raised inside a worker when one file exceeds its extraction budget.
+
+    Derives from BaseException so the extractors' broad ``except Exception``
+    fallbacks can't swallow it.
+    """
+
+def _raise_timeout(signum, frame):
+    raise ExtractionTimeout()
+
+def _alarm_available() -> bool:
+    # SIGALRM only works on Unix and in the main thread (true for pool workers)
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+def _process_file(filepath: str, timeout: Optional[float] = None,
+                  max_pages: Optional[int] = None,
+                  max_chars: Optional[int] = None,
+                  fingerprint: bool = False) -> Tuple[Optional[str], Optional[str], Optional[tuple]]:
+    """Extract and clean one file; returns (text, error message, fingerprint).
+
+    With ``fingerprint`` the file's file_fingerprint() is taken before it
+    is read, so the manifest records the version the text came from.
+    """
+    use_alarm = bool(timeout) and _alarm_available()
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        fp = file_fingerprint(filepath) if fingerprint else None
+        # Strict, so a corrupt file is reported rather than ranked as empty
+        text = extract_text(filepath, max_pages=max_pages, max_chars=max_chars, strict=True)
+        return clean_text(text), None, fp
+    except ExtractionTimeout:
+        return None, f"timed out after {timeout}s", None
+    except Exception as e:
+        return None, str(e) or type(e).__name__, None
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+def _resume_files(directory: str) -> List[str]:
+    # Sorted so the output order doesn't depend on the filesystem
+    return sorted(
+        filename for filename in os.listdir(directory)
+        if os.path.splitext(filename)[1].lower() in ALLOWED_EXTENSIONS
+    )
+
+def _outcomes(paths: List[str], workers: int, timeout: Optional[float], manifest,
+              limits: Dict[str, Optional[int]]):
+    """Yield (path, (text, error, fingerprint), manifest entry or None) in path order.
+
+    Files the manifest already knows are not extracted again. With several
+    workers at most ``workers * 4`` files are in flight, so results never
+    pile up faster than the consumer takes them. A worker that overruns
+    its timeout by _TIMEOUT_SLACK seconds (e.g. stuck in C code) is killed
+    and recorded as that file's error. When a worker crashes, the file is
+    retried on its own to tell whether it caused the crash. Either way the
+    pool is replaced and the other in-flight files are resubmitted.
+    """
+    def lookup(path):
+        # Text extracted under other caps doesn't count as a hit
+        return manifest.lookup(path, options=limits) if manifest is not None else None
+
+    kwargs = dict(limits, fingerprint=manifest is not None)
+
+    # In-process extraction can only be interrupted by SIGALRM; when that
+    # isn't available (another thread, Windows) use a worker process instead
+    if workers == 1 and (not timeout or _alarm_available()):
+        for path in paths:
+            hit = lookup(path)
+            yield path, ((hit["text"], None, None) if hit else _process_file(path, timeout, **kwargs)), hit
+        return
+
+    backstop = timeout + _TIMEOUT_SLACK if timeout else None
+    executor = ProcessPoolExecutor(max_workers=workers)
+    pending = deque()
+
+    def restart():
+        nonlocal executor
+        _terminate(executor)
+        executor = ProcessPoolExecutor(max_workers=workers)
+
+    def submit(path):
+        try:
+            return executor.submit(_process_file, path, timeout, **kwargs)
+        except BrokenProcessPool:
+            restart()
+            return executor.submit(_process_file, path, timeout, **kwargs)
+
+    def resubmit():
+        # Files the old pool took down with it get a fresh attempt
+        for i, (path, hit, future) in enumerate(pending):
+            if future is not None and not _completed(future):
+                pending[i] = (path, hit, submit(path))
+
+    def resolve(entry):
+        path, hit, future = entry
+        if hit:
+            return path, (hit["text"], None, None), hit
+        try:
+            return path, future.result(timeout=backstop), hit
+        except FutureTimeout:
+            restart()
+            resubmit()
+            return path, (None, f"timed out after {timeout}s", None), hit
+        except BrokenProcessPool:
+            pass
+        except Exception as e:
+            return path, (None, str(e) or type(e).__name__, None), hit
+        # Some worker died, not necessarily on this file: retry it on its own
+        restart()
+        try:
+            outcome = executor.submit(_process_file, path, timeout, **kwargs).result(timeout=backstop)
+        except FutureTimeout:
+            restart()
+            outcome = (None, f"timed out after {timeout}s", None)
+        except BrokenProcessPool as e:
+            restart()
+            outcome = (None, str(e) or type(e).__name__, None)
+        resubmit()
+        return path, outcome, hit
+
+    window = workers * 4
+    try:
+        for path in paths:
+            hit = lookup(path)
+            pending.append((path, hit, None if hit else submit(path)))
+            while pending and (pending[0][1] or len(pending) >= window):
+                yield resolve(pending.popleft())
+        while pending:
+            yield resolve(pending.popleft())
+    finally:
+        if pending:
+            # Abandoned early: don't wait for files nobody will read
+            _terminate(executor)
+        else:
+            executor.shutdown(wait=True)
+
+def _completed(future) -> bool:
+    """True if the future holds a result that outlived its pool."""
+    return (future.done() and not future.cancelled()
+            and not isinstance(future.exception(), BrokenProcessPool))
+
+def _terminate(executor: ProcessPoolExecutor):
+    """Shut a pool down without waiting on its running tasks.
+
+    shutdown() can't interrupt a task that is already running, and the
+    interpreter joins the pool's threads at exit, so a worker stuck in C
+    code would hang the process. Killing the workers first unblocks both.
+    """
+    # ProcessPoolExecutor has no public way to reach its workers; this is
+    # the only place that relies on its private _processes mapping
+    for process in list((getattr(executor, "_processes", None) or {}).values()):
+        process.kill()
+    executor.shutdown(wait=True, cancel_futures=True)
+
+def iter_resumes(directory: str, workers: Optional[int] = 1,
+                 timeout: Optional[float] = None,
+                 errors: Optional[List[Dict[str, str]]] = None,
+                 manifest=None, max_pages: Optional[int] = None,
+                 max_chars: Optional[int] = None) -> Iterator[Dict[str, str]]:
+    """Yield resumes one at a time (discovery -> extraction -> cleaning).
+
+    Takes the same arguments as load_resumes; with several workers only a
+    small window of files is in flight, so memory stays flat however many
+    files the directory holds.
+    """
+    filenames = _resume_files(directory)
+    paths = [os.path.join(directory, filename) for filename in filenames]
+    if not workers:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(paths)) or 1
+    if manifest is not None:
+        manifest.prune(directory, paths)
+
+    limits = {"max_pages": max_pages, "max_chars": max_chars}
+    for path, (cleaned, error, fingerprint), hit in _outcomes(paths, workers, timeout, manifest, limits):
+        filename = os.path.basename(path)
+        if error is not None:
+            if errors is None:
+                print(f"Error processing {filename}: {error}")
+            else:
+                errors.append({"filename": filename, "error": error})
+            continue
+        resume = {"filename": filename, "text": cleaned}
+        entities = hit["entities"] if hit else None
+        if hit is None and manifest is not None:
+            entities = manifest.store(path, cleaned, fingerprint, options=limits)
+        if entities is not None:
+            resume["entities"] = ExtractedEntities(**entities)
+        yield resume
+
+def load_resumes(directory: str, workers: Optional[int] = 1,
+                 timeout: Optional[float] = None,
+                 errors: Optional[List[Dict[str, str]]] = None,
+                 manifest=None, max_pages: Optional[int] = None,
+                 max_chars: Optional[int] = None) -> List[Dict[str, str]]:
     """Load all resumes from the given directory.
     
     Args:
         directory: Path to directory containing resume files
+        workers: Number of extraction processes; 1 extracts in this process,
+            None or 0 uses one per CPU
+        timeout: Seconds allowed per file before it is abandoned; when this
+            process can't interrupt itself (not the main thread, or no
+            SIGALRM), extraction runs in a worker process instead
+        errors: If given, a list that receives {'filename', 'error'} for each
+            file that failed; otherwise failures are printed
+        manifest: Optional ExtractionManifest; only new or changed files are
+            extracted, and entries for deleted files are dropped
+        max_pages: Stop reading PDFs after this many pages
+        max_chars: Stop reading any file after this many characters
         
     Returns:
-        List of dicts with 'filename' and 'text' keys
+        List of dicts with 'filename' and 'text' keys (plus 'entities' when
+        the manifest stores them), ordered by filename
     """
-    resumes = []
-    for filename in os.listdir(directory):
-        if os.path.splitext(filename)[1].lower() in ALLOWED_EXTENSIONS:
-            filepath = os.path.join(directory, filename)
-            try:
-                text = extract_text(filepath)
-                cleaned = clean_text(text)
-                resumes.append({"filename": filename, "text": cleaned})
-            except Exception as e:
-                print(f"Error processing {filename}: {e}")
-    return resumes
\ No newline at end of file
+    return list(iter_resumes(directory, workers=workers, timeout=timeout,
+                             errors=errors, manifest=manifest,
+                             max_pages=max_pages, max_chars=max_chars))
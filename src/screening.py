@@ -0,0 +1,80 @@
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from src.candidate_ranker import prepare_job, rank_candidates
+from src.entity_extractor import attach_entities
+from src.nlp_matcher import DEFAULT_BATCH_SIZE, similarity_matrix
+
+# progress(stage, done, total); stages run in order: entities, embed, rank
+Progress = Callable[[str, int, int], None]
+
+# Resumes handed to entity extraction between progress reports
+_ENTITY_CHUNK = 64
+
+def resume_records(resumes: Iterable[Union[str, Dict]]) -> List[Dict]:
+    """Normalize resumes into records that each carry a stable 'id'.
+
+    Dicts are copied shallowly (the caller's dicts are never modified)
+    and keep any 'id' they already have; otherwise the id is the resume's
+    position in the input. Plain strings become {'id', 'text', 'filename'}
+    records.
+    """
+    records = []
+    for position, resume in enumerate(resumes):
+        if isinstance(resume, dict):
+            resume = dict(resume, id=resume.get("id", position))
+        else:
+            resume = {"id": position, "text": resume, "filename": "Resume"}
+        records.append(resume)
+    return records
+
+def screen(resumes: Iterable[Union[str, Dict]], job_description: str,
+           top_k: Optional[int] = None, min_score: Optional[float] = None,
+           batch_size: int = DEFAULT_BATCH_SIZE,
+           progress: Optional[Progress] = None) -> List[Dict]:
+    """Match and rank resumes against one job description.
+
+    Returns rank_candidates() results, best first, each carrying the 'id'
+    of the resume record it was computed from.
+    """
+    return screen_many(resumes, [job_description], top_k=top_k, min_score=min_score,
+                       batch_size=batch_size, progress=progress)[0]
+
+def screen_many(resumes: Iterable[Union[str, Dict]], job_descriptions: Sequence[str],
+                top_k: Optional[int] = None, min_score: Optional[float] = None,
+                batch_size: int = DEFAULT_BATCH_SIZE,
+                progress: Optional[Progress] = None) -> List[List[Dict]]:
+    """Match and rank resumes against several job descriptions.
+
+    Entities are extracted once per resume and every text is embedded once;
+    each job's row of the similarity matrix is then ranked directly against
+    the shared records, so nothing is copied or joined back per job.
+    ``progress`` is called as each stage advances.
+    """
+    return [ranked for _, ranked in iter_screen_many(resumes, job_descriptions, top_k=top_k,
+                                                      min_score=min_score, batch_size=batch_size,
+                                                      progress=progress)]
+
+def iter_screen_many(resumes: Iterable[Union[str, Dict]], job_descriptions: Sequence[str],
+                     top_k: Optional[int] = None, min_score: Optional[float] = None,
+                     batch_size: int = DEFAULT_BATCH_SIZE,
+                     progress: Optional[Progress] = None) -> Iterator[Tuple[int, List[Dict]]]:
+    """Like screen_many, but yield (job index, ranked results) as soon as
+    each job is ranked, so callers can stream results out."""
+    report = progress or (lambda stage, done, total: None)
+    records = resume_records(resumes)
+    for start in range(0, len(records), _ENTITY_CHUNK):
+        attach_entities(records[start:start + _ENTITY_CHUNK])
+        report("entities", min(start + _ENTITY_CHUNK, len(records)), len(records))
+    embed_progress = None
+    if progress is not None:
+        embed_progress = lambda done, total: progress("embed", done, total)
+    matrix = similarity_matrix(job_descriptions, [record["text"] for record in records],
+                               batch_size=batch_size, progress=embed_progress)
+    for index, (job_description, row) in enumerate(zip(job_descriptions, matrix)):
+        # One row at a time, so only one job's scores exist as Python floats;
+        # rounded like match_resumes_to_many_jobs, so scores agree with it
+        similarities = [round(score, 2) for score in row.tolist()]
+        ranked = rank_candidates(records, prepare_job(job_description), top_k=top_k,
+                                 min_score=min_score, similarities=similarities)
+        report("rank", index + 1, len(job_descriptions))
+        yield index, ranked
@@ -0,0 +1,106 @@
+import heapq
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from src.candidate_ranker import prepare_job, rank_candidates
+from src.nlp_matcher import DEFAULT_BATCH_SIZE, get_embeddings
+from src.resume_processor import iter_resumes
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    """Group an iterable into lists of at most ``size`` items."""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def embed_batches(resumes: Iterable[Dict], batch_size: int = DEFAULT_BATCH_SIZE
+                  ) -> Iterator[Tuple[List[Dict], np.ndarray]]:
+    """Yield (resumes, embeddings) for bounded batches of a resume stream."""
+    for batch in batched(resumes, batch_size):
+        yield batch, get_embeddings([resume["text"] for resume in batch], batch_size=batch_size)
+
+# top_k used by main.py's streaming mode when the config leaves it unset
+DEFAULT_STREAM_TOP_K = 10
+
+def stream_top_candidates(resumes: Iterable[Dict], job_description: str, top_k: int = 10,
+                          min_score: Optional[float] = None,
+                          batch_size: int = DEFAULT_BATCH_SIZE) -> List[Dict]:
+    """Rank a resume stream against one job, keeping only a running top-K.
+
+    See stream_top_candidates_many; the result equals
+    rank_candidates(all_resumes, ..., top_k=top_k).
+    """
+    return stream_top_candidates_many(resumes, [job_description], top_k=top_k,
+                                      min_score=min_score, batch_size=batch_size)[0]
+
+def stream_top_candidates_many(resumes: Iterable[Dict], job_descriptions: Sequence[str],
+                               top_k: int = 10, min_score: Optional[float] = None,
+                               batch_size: int = DEFAULT_BATCH_SIZE) -> List[List[Dict]]:
+    """Rank a resume stream against several jobs in a single pass.
+
+    Each batch of resumes is embedded once and scored against every job's
+    embedding; each job's survivors are merged into its own heap of size
+    top_k, so peak memory depends on batch_size, top_k and the number of
+    jobs rather than on the number of resumes. top_k must be finite. The
+    resume dicts are not modified.
+    """
+    if top_k is None:
+        raise ValueError("streaming needs a finite top_k")
+    if top_k <= 0 or not job_descriptions:
+        return [[] for _ in job_descriptions]
+    reqs = [prepare_job(job_description) for job_description in job_descriptions]
+    job_embs = get_embeddings(list(job_descriptions), batch_size=batch_size)
+    # Entries are (final_score, -position, result); position breaks ties in input order
+    heaps: List[List[Tuple[float, int, Dict]]] = [[] for _ in reqs]
+    seen = 0
+    for batch, embeddings in embed_batches(resumes, batch_size):
+        scores = cosine_similarity(job_embs, embeddings) * 100.0
+        for req, heap, row in zip(reqs, heaps, scores):
+            similarities = [round(score, 2) for score in row.tolist()]
+            # Ranked output is a stable sort, so its positions respect input order among ties
+            ranked = rank_candidates(batch, req, top_k=top_k, min_score=min_score,
+                                     similarities=similarities)
+            for pos, result in enumerate(ranked):
+                entry = (result["final_score"], -(seen + pos), result)
+                if len(heap) < top_k:
+                    heapq.heappush(heap, entry)
+                elif entry[:2] > heap[0][:2]:
+                    heapq.heapreplace(heap, entry)
+        seen += len(batch)
+    return [[result for _, _, result in sorted(heap, key=lambda e: e[:2], reverse=True)]
+            for heap in heaps]
+
+def stream_directory(directory: str, job_description: str, top_k: int = 10,
+                     min_score: Optional[float] = None,
+                     batch_size: int = DEFAULT_BATCH_SIZE, workers: Optional[int] = 1,
+                     timeout: Optional[float] = None,
+                     errors: Optional[List[Dict[str, str]]] = None,
+                     manifest=None, max_pages: Optional[int] = None,
+                     max_chars: Optional[int] = None) -> List[Dict]:
+    """Discover, extract, clean, embed and rank a resume directory as a stream.
+
+    The ingestion arguments are those of load_resumes.
+    """
+    return stream_directory_many(directory, [job_description], top_k=top_k,
+                                 min_score=min_score, batch_size=batch_size,
+                                 workers=workers, timeout=timeout, errors=errors,
+                                 manifest=manifest, max_pages=max_pages,
+                                 max_chars=max_chars)[0]
+
+def stream_directory_many(directory: str, job_descriptions: Sequence[str], top_k: int = 10,
+                          min_score: Optional[float] = None,
+                          batch_size: int = DEFAULT_BATCH_SIZE, workers: Optional[int] = 1,
+                          timeout: Optional[float] = None,
+                          errors: Optional[List[Dict[str, str]]] = None,
+                          manifest=None, max_pages: Optional[int] = None,
+                          max_chars: Optional[int] = None) -> List[List[Dict]]:
+    """stream_directory for several jobs: the directory is read once and
+    each resume is extracted and embedded once, whatever the job count."""
+    resumes = iter_resumes(directory, workers=workers, timeout=timeout, errors=errors,
+                           manifest=manifest, max_pages=max_pages, max_chars=max_chars)
+    return stream_top_candidates_many(resumes, job_descriptions, top_k=top_k,
+                                      min_score=min_score, batch_size=batch_size)
@@ -32,7 +32,7 @@ years = extract_experience_years(cleaned_text)
 print(f"Detected years of experience: {years}")
 
 print("\n--- All Extracted Entities ---")
-entities = extract_entities(cleaned_text)
+entities = extract_entities(cleaned_text, include_organizations=True)
 for key, value in entities.items():
     print(f"{key}: {value}")
 
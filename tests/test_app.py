@@ -0,0 +1,64 @@
+import io
+import json
+import numpy as np
+import pytest
+from src import screening
+
+app_module = pytest.importorskip("app")
+
+def _fake_matrix(jobs, texts, batch_size=None, progress=None):
+    return np.random.default_rng(0).uniform(0, 100, (len(jobs), len(texts)))
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(screening, "similarity_matrix", _fake_matrix)
+    monkeypatch.setattr(app_module, "REST_API_ENABLED", True)
+    return app_module.app.test_client()
+
+def test_api_screen_json(client):
+    resumes = ["Python developer, 5 years", {"id": "x", "text": "SQL analyst", "filename": "x.txt"}]
+    response = client.post("/api/screen", json={"job_description": "Python developer",
+                                                "resumes": resumes, "min_score": 0})
+    assert response.status_code == 200
+    assert {r["id"] for r in response.json["results"]} == {0, "x"}
+    assert client.post("/api/screen", json={"resumes": resumes}).status_code == 400
+
+def test_api_batch_streams_one_line_per_job(client):
+    response = client.post("/api/screen/batch", data={
+        "job_description": ["Python developer", "Data analyst"],
+        "min_score": "0",
+        "resumes": [(io.BytesIO(b"Python, 5 years"), "a.txt"), (io.BytesIO(b"SQL"), "b.txt")],
+    }, content_type="multipart/form-data")
+    assert response.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.data.decode().splitlines()]
+    expected = screening.screen_many(["Python, 5 years", "SQL"],
+                                     ["Python developer", "Data analyst"], min_score=0)
+    assert [line["type"] for line in lines] == ["job", "job", "summary"]
+    for line, ranked in zip(lines, expected):
+        assert [r["final_score"] for r in line["results"]] == [r["final_score"] for r in ranked]
+
+def test_api_rejects_non_string_descriptions(client):
+    for jobs in ([{"description": 5}], [{"description": "   "}], [7]):
+        response = client.post("/api/screen/batch", json={"jobs": jobs, "resumes": ["Python"]})
+        assert response.status_code == 400
+
+def test_api_rejects_out_of_range_options(client):
+    body = {"job_description": "Python developer", "resumes": ["Python"]}
+    for options in ({"top_k": -3}, {"top_k": 0}, {"top_k": True}, {"top_k": 2.5},
+                    {"top_k": "two"}, {"min_score": 101}, {"min_score": -1},
+                    {"min_score": False}, {"min_score": "NaN"}):
+        response = client.post("/api/screen", json=dict(body, **options))
+        assert response.status_code == 400, options
+    response = client.post("/api/screen", data={
+        "job_description": "Python developer", "top_k": "1", "min_score": "0",
+        "resumes": [(io.BytesIO(b"Python"), "a.txt"), (io.BytesIO(b"SQL"), "b.txt")],
+    }, content_type="multipart/form-data")
+    assert response.status_code == 200
+    assert len(response.json["results"]) == 1
+
+def test_debugger_only_on_loopback_hosts():
+    assert app_module._is_loopback("127.0.0.1")
+    assert app_module._is_loopback("localhost")
+    assert app_module._is_loopback("::1")
+    assert not app_module._is_loopback("0.0.0.0")
+    assert not app_module._is_loopback("example.com")
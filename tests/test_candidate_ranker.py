@@ -0,0 +1,126 @@
+from src.candidate_ranker import JobRequirements, prepare_job, rank_candidates
+
+JOB = "Senior Python engineer with 5+ years of experience in AWS and Docker. Masters preferred."
+RESUMES = [
+    {"filename": "a.txt", "text": "Senior engineer, 6 years of experience with Python, AWS, Docker. Masters.", "similarity": 70.0},
+    {"filename": "b.txt", "text": "Junior analyst, 1 year of experience with Excel.", "similarity": 50.0},
+]
+
+def test_prepare_job_is_memoized_and_hashable():
+    req = prepare_job(JOB)
+    assert prepare_job(JOB) is req
+    assert isinstance(req, JobRequirements)
+    assert req.skills == {"aws", "docker", "python"}
+    assert req.min_years == 5
+    assert hash(req) == hash(prepare_job(JOB))
+
+def test_prepare_job_is_reparsed_after_vocabulary_refresh(monkeypatch):
+    from src.entity_extractor import refresh_skill_matcher
+    from src.skills_db import SKILL_SYNONYMS
+
+    assert prepare_job("Rust engineer").skills == frozenset()
+    monkeypatch.setitem(SKILL_SYNONYMS, "rust", ["rust"])
+    refresh_skill_matcher()
+    try:
+        assert prepare_job("Rust engineer").skills == {"rust"}
+    finally:
+        monkeypatch.undo()
+        refresh_skill_matcher()
+    assert prepare_job("Rust engineer").skills == frozenset()
+
+def test_rank_candidates_accepts_prepared_job():
+    by_text = rank_candidates(RESUMES, JOB)
+    assert rank_candidates(RESUMES, prepare_job(JOB)) == by_text
+    assert [r["filename"] for r in by_text] == ["a.txt", "b.txt"]
+
+def test_rank_candidates_uses_attached_entities():
+    from src.entity_extractor import attach_entities
+
+    resumes = attach_entities([dict(r) for r in RESUMES])
+    expected = rank_candidates(RESUMES, JOB)
+    # With entities attached the text is never parsed again
+    stripped = [dict(r, text="") for r in resumes]
+    assert rank_candidates(stripped, JOB) == expected
+    as_dicts = [dict(r, entities=r["entities"].to_dict(), text="") for r in resumes]
+    assert rank_candidates(as_dicts, JOB) == expected
+
+def test_select_top_matches_full_sort():
+    import numpy as np
+    from src.candidate_ranker import select_top
+
+    scores = np.round(np.random.default_rng(1).random(5000) * 100, 0)  # many ties
+    full = np.argsort(-scores, kind="stable")
+    assert (select_top(scores) == full).all()
+    assert (select_top(scores, top_k=25) == full[:25]).all()
+    kept = full[scores[full] >= 90.0]
+    assert (select_top(scores, top_k=10_000, min_score=90.0) == kept).all()
+    assert (select_top(scores, top_k=7, min_score=90.0) == kept[:7]).all()
+
+def test_rank_candidates_top_k_and_min_score():
+    ranked = rank_candidates(RESUMES, JOB)
+    assert rank_candidates(RESUMES, JOB, top_k=1) == ranked[:1]
+    cutoff = ranked[0]["final_score"]
+    assert rank_candidates(RESUMES, JOB, min_score=cutoff) == ranked[:1]
+
+def test_minimum_score_is_a_fraction():
+    import pytest
+    from src.candidate_ranker import minimum_score_from_config
+
+    class FakeConfig(dict):
+        def get(self, key, default=None):
+            return super().get(key, default)
+
+    assert minimum_score_from_config(FakeConfig(minimum_score=0.6)) == pytest.approx(60.0)
+    assert minimum_score_from_config(FakeConfig(minimum_score=1)) == 100.0
+    assert minimum_score_from_config(FakeConfig(minimum_score=0)) == 0.0
+    assert minimum_score_from_config(FakeConfig()) is None
+    for bad in (1.5, 60, -0.1):
+        with pytest.raises(ValueError):
+            minimum_score_from_config(FakeConfig(minimum_score=bad))
+
+def _reference_score(req, ents, base):
+    """The per-candidate scoring loop the NumPy kernel replaced."""
+    matched = req.skills & set(ents.skills)
+    skills_bonus = len(matched) / max(1, len(req.skills)) * 20.0 if req.skills else 0.0
+    exp_bonus = 0.0
+    if req.min_years:
+        if ents.experience_years >= req.min_years:
+            exp_bonus = min(10.0, (ents.experience_years - req.min_years + 1) * 2.5)
+        else:
+            exp_bonus = -min(10.0, (req.min_years - ents.experience_years) * 2.0)
+    seniority_bonus = 5.0 if req.seniority and ents.seniority and req.seniority == ents.seniority else 0.0
+    edu_bonus = 0.0
+    if req.education_level:
+        from src.candidate_ranker import _education_score
+        if _education_score(ents.education) >= _education_score(req.education_level):
+            edu_bonus = 5.0
+    return round(max(0.0, min(100.0, base + skills_bonus + exp_bonus + seniority_bonus + edu_bonus)), 2)
+
+def test_score_kernel_matches_reference_loop():
+    import random
+    from src.entity_extractor import ExtractedEntities
+
+    rng = random.Random(7)
+    jobs = [prepare_job(JOB), prepare_job("Looking for someone friendly."),
+            JobRequirements(skills=frozenset({"python"}), seniority="junior",
+                            education_level="phd", min_years=3, digest="x")]
+    skills = ["python", "aws", "docker", "excel", "java"]
+    records = []
+    for i in range(300):
+        ents = ExtractedEntities(
+            skills=rng.sample(skills, rng.randint(0, 4)),
+            experience_years=rng.randint(0, 12),  # often below the requirement
+            seniority=rng.choice([None, "junior", "senior"]),
+            education=rng.choice([None, "bachelors", "masters", "phd", "unknown"]),
+        )
+        # Coarse similarities so many candidates tie on final score
+        records.append({"filename": f"{i}.txt", "entities": ents,
+                        "similarity": float(rng.choice([0, 10, 50, 95, 100]))})
+    for req in jobs:
+        ranked = rank_candidates(records, req)
+        expected = [_reference_score(req, r["entities"], r["similarity"]) for r in records]
+        # Stable descending sort: ties stay in input order
+        order = sorted(range(len(records)), key=lambda i: -expected[i])
+        assert [r["filename"] for r in ranked] == [records[i]["filename"] for i in order]
+        assert [r["final_score"] for r in ranked] == [expected[i] for i in order]
+        assert rank_candidates([], req) == []
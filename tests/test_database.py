@@ -0,0 +1,195 @@
+import threading
+from src.database import Database
+
+def _db(tmp_path):
+    return Database(str(tmp_path / "screening.db"))
+
+def test_roundtrip_and_wal_mode(tmp_path):
+    db = _db(tmp_path)
+    job_id = db.add_job("Data Scientist", "Python and ML", ["python"], ["aws"])
+    cand_id = db.add_candidate("Sarah", "s@example.com", "555", "resume", ["python"], 6, "masters")
+    db.add_screening(job_id, cand_id, 80.0, 20.0, 95.5, "Strong match")
+    rows = db.get_job_candidates(job_id)
+    assert [(r["name"], r["total_score"]) for r in rows] == [("Sarah", 95.5)]
+    assert db.get_candidate_history(cand_id)[0]["job_title"] == "Data Scientist"
+    assert db._connect().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    db.close()
+
+def test_concurrent_writers(tmp_path):
+    db = _db(tmp_path)
+    job_id = db.add_job("Engineer", "desc", [], [])
+    errors = []
+
+    def worker(n):
+        try:
+            for i in range(25):
+                cand_id = db.add_candidate(f"c{n}-{i}", "", "", "text", [], i, None)
+                db.add_screening(job_id, cand_id, 50.0, 0.0, float(i), "")
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert len(db.get_job_candidates(job_id)) == 200
+    db.close()
+
+def test_bulk_inserts_return_ids_in_order(tmp_path):
+    db = _db(tmp_path)
+    job_id = db.add_job("Engineer", "desc", [], [])
+    single = db.add_candidate("first", "", "", "t0", [], 1, None)
+    candidates = [{"name": f"c{i}", "resume_text": f"t{i}", "skills": ["python"],
+                   "experience_years": i} for i in range(1, 8)]
+    ids = db.add_candidates_many(candidates, chunk_size=3)
+    assert ids == list(range(single + 1, single + 8))
+    screening_ids = db.add_screenings_many(
+        [{"job_id": job_id, "candidate_id": cid, "total_score": float(cid)} for cid in ids],
+        chunk_size=4,
+    )
+    assert len(set(screening_ids)) == 7
+    rows = db.get_job_candidates(job_id)
+    assert [r["id"] for r in rows] == sorted(ids, reverse=True)
+    assert rows[-1]["name"] == "c1"
+
+def test_upsert_candidates_by_resume_hash(tmp_path):
+    db = _db(tmp_path)
+    first = db.upsert_candidates_many([
+        {"name": "a", "resume_text": "same text"},
+        {"name": "b", "resume_text": "other text"},
+    ])
+    again = db.upsert_candidates_many([
+        {"name": "b2", "resume_text": "other text"},
+        {"name": "c", "resume_text": "new text"},
+        {"name": "a2", "resume_text": "same text"},
+    ], chunk_size=2)
+    assert again[0] == first[1] and again[2] == first[0]
+    assert again[1] not in first
+    count = db._connect().execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+    assert count == 3
+
+def test_skills_are_normalized_and_queried_in_sql(tmp_path):
+    db = _db(tmp_path)
+    job_id = db.add_job("Engineer", "desc", [], [])
+    a = db.add_candidate("a", "", "", "ta", ["python", "sql"], 3, None)
+    b, c = db.add_candidates_many([
+        {"name": "b", "resume_text": "tb", "skills": ["python", "aws"]},
+        {"name": "c", "resume_text": "tc", "skills": ["python"]},
+    ])
+    db.add_screenings_many([{"job_id": job_id, "candidate_id": cid, "total_score": 1.0}
+                            for cid in (a, b)])
+    assert db.skill_frequencies() == [("python", 3), ("aws", 1), ("sql", 1)]
+    assert db.skill_frequencies(limit=1, job_id=job_id) == [("python", 2)]
+    assert [r["name"] for r in db.find_candidates_with_skills(["python", "aws"])] == ["b"]
+    assert [r["id"] for r in db.find_candidates_with_skills(["aws", "sql"], match_all=False)] == [a, b]
+    # Upserts replace a candidate's skills
+    (cid,) = db.upsert_candidates_many([{"name": "d", "resume_text": "td", "skills": ["java"]}])
+    db.upsert_candidates_many([{"name": "d", "resume_text": "td", "skills": ["go"]}])
+    assert db.find_candidates_with_skills(["java"]) == []
+    assert [r["id"] for r in db.find_candidates_with_skills(["go"])] == [cid]
+
+def test_job_lookup_uses_index(tmp_path):
+    db = _db(tmp_path)
+    plan = db._connect().execute(
+        "EXPLAIN QUERY PLAN SELECT candidate_id FROM screenings WHERE job_id = ? "
+        "ORDER BY total_score DESC", (1,)
+    ).fetchall()
+    assert any("idx_screenings_job_score" in row[-1] for row in plan)
+
+def test_keyset_pagination_matches_full_listing(tmp_path):
+    db = _db(tmp_path)
+    job_id = db.add_job("Engineer", "desc", [], [])
+    other_job = db.add_job("Other", "desc", [], [])
+    ids = db.add_candidates_many({"name": f"c{i}", "resume_text": "x" * 100} for i in range(23))
+    db.add_screenings_many(
+        [{"job_id": job_id, "candidate_id": cid, "total_score": float(i % 5)} for i, cid in enumerate(ids)]
+        + [{"job_id": other_job, "candidate_id": ids[0], "total_score": 99.0}]
+    )
+    expected = sorted(
+        ((float(i % 5), cid) for i, cid in enumerate(ids)), key=lambda r: (-r[0], r[1])
+    )
+    page, cursor = db.get_job_candidates_page(job_id, limit=10)
+    assert len(page) == 10 and cursor is not None
+    assert "resume_text" not in page[0]
+    streamed = list(db.iter_job_candidates(job_id, page_size=4))
+    assert [(r["total_score"], r["id"]) for r in streamed] == expected
+    with_text = next(db.iter_job_candidates(job_id, include_resume_text=True))
+    assert with_text["resume_text"] == "x" * 100
+
+def test_score_aggregates_match_python(tmp_path):
+    import numpy as np
+    db = _db(tmp_path)
+    job_id = db.add_job("Engineer", "desc", [], [])
+    assert db.get_job(job_id)["title"] == "Engineer" and db.get_job(job_id + 1) is None
+    scores = [float(s) for s in np.random.default_rng(0).uniform(0, 100, 37)]
+    ids = db.add_candidates_many({"name": f"c{i}", "resume_text": f"t{i}", "experience_years": i % 7}
+                                 for i in range(len(scores)))
+    db.add_screenings_many([{"job_id": job_id, "candidate_id": cid, "total_score": score}
+                            for cid, score in zip(ids, scores)])
+    summary = db.score_summary(job_id, percentiles=(0, 25, 50, 90, 100))
+    assert summary["count"] == len(scores)
+    assert abs(summary["mean"] - np.mean(scores)) < 1e-9
+    assert abs(summary["mean_experience"] - np.mean([i % 7 for i in range(len(scores))])) < 1e-9
+    for p, value in summary["percentiles"].items():
+        assert abs(value - np.percentile(scores, p)) < 1e-9
+    histogram = db.score_histogram(job_id, bins=10)
+    expected, _ = np.histogram(scores, bins=10)
+    assert [count for _, _, count in histogram] == expected.tolist()
+    assert len(db.experience_score_samples(job_id, limit=10)) == 10
+    assert sorted(s for _, s in db.experience_score_samples(job_id)) == sorted(scores)
+    assert db.score_summary(job_id + 1)["count"] == 0 and db.score_histogram(job_id + 1) == []
+    assert len(db.get_all_candidates()) == len(scores)
+
+def test_connections_close_when_threads_exit(tmp_path):
+    import threading
+    db = _db(tmp_path)
+    job_id = db.add_job("Engineer", "desc", [], [])
+    threads = [threading.Thread(target=db.get_job, args=(job_id,)) for _ in range(50)]
+    for t in threads:
+        t.start()
+        t.join()
+    assert len(db._connections) == 1  # only the main thread's
+    db.close()
+
+def test_upsert_never_merges_candidates_without_text(tmp_path):
+    db = _db(tmp_path)
+    ids = db.upsert_candidates_many([{"name": "a"}, {"name": "b", "resume_text": ""},
+                                     {"name": "c", "resume_text": "text"}])
+    assert len(set(ids)) == 3
+    assert db.upsert_candidates_many([{"name": "a"}])[0] not in ids
+    assert db.upsert_candidates_many([{"name": "c2", "resume_text": "text"}]) == [ids[2]]
+
+def test_pagination_includes_unscored_screenings(tmp_path):
+    import pytest
+    db = _db(tmp_path)
+    job_id = db.add_job("Engineer", "desc", [], [])
+    ids = db.add_candidates_many({"name": f"c{i}", "resume_text": f"t{i}"} for i in range(5))
+    db.add_screenings_many([{"job_id": job_id, "candidate_id": cid, "total_score": score}
+                            for cid, score in zip(ids, [None, None, 5.0, None, 7.0])])
+    expected = [ids[4], ids[2], ids[0], ids[1], ids[3]]
+    assert len(db.get_job_candidates(job_id)) == 5
+    for page_size in (1, 2, 3, 10):
+        assert [r["id"] for r in db.iter_job_candidates(job_id, page_size=page_size)] == expected
+    with pytest.raises(ValueError):
+        db.get_job_candidates_page(job_id, limit=0)
+
+def test_score_aggregates_ignore_orphan_screenings(tmp_path):
+    import numpy as np
+    import pytest
+    db = _db(tmp_path)
+    job_id = db.add_job("Engineer", "desc", [], [])
+    ids = db.add_candidates_many({"name": f"c{i}", "resume_text": f"t{i}"} for i in range(5))
+    scores = [10.0, 20.0, 30.0, 40.0, 50.0]
+    db.add_screenings_many([{"job_id": job_id, "candidate_id": cid, "total_score": score}
+                            for cid, score in zip(ids, scores)])
+    # Screenings whose candidate row is gone
+    db.add_screenings_many([{"job_id": job_id, "candidate_id": 999, "total_score": 0.0}] * 3)
+    summary = db.score_summary(job_id, percentiles=(0, 50, 100))
+    assert summary["count"] == 5
+    assert summary["percentiles"] == {p: np.percentile(scores, p) for p in (0, 50, 100)}
+    assert sum(count for _, _, count in db.score_histogram(job_id, bins=4)) == 5
+    assert len(db.experience_score_samples(job_id, limit=5)) == 5
+    with pytest.raises(ValueError):
+        db.score_histogram(job_id, bins=0)
@@ -0,0 +1,60 @@
+import numpy as np
+from src.embedding_cache import EmbeddingCache
+
+def test_cache_roundtrip_and_counters(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "test-model", memory_items=1)
+    vec = np.arange(4, dtype=np.float32)
+    assert cache.get("hello") is None
+    cache.put("hello", vec)
+    cache.put("other", vec + 1)  # pushes "hello" out of the memory tier
+    assert np.array_equal(cache.get("hello"), vec)
+    assert cache.stats["misses"] == 1
+    assert cache.stats["disk_hits"] == 1
+
+    # A fresh instance (new process) reads the vectors back from disk
+    reloaded = EmbeddingCache(str(tmp_path), "test-model")
+    assert np.array_equal(reloaded.get("other"), vec + 1)
+    assert EmbeddingCache(str(tmp_path), "another-model").get("other") is None
+
+def test_cache_evicts_to_size_budget(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "m", max_disk_bytes=2048, memory_items=0)
+    for i in range(20):
+        cache.put(f"text {i}", np.zeros(64, dtype=np.float32))
+    assert cache.stats["disk_bytes"] <= 2048
+
+def test_cache_stores_compact_blobs_and_batches_lookups(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "m", max_disk_bytes=20 * 1536, memory_items=0)
+    for i in range(5):
+        cache.put(f"text {i}", np.full(384, i, dtype=np.float32))
+    assert cache.stats["disk_bytes"] == 5 * 384 * 4
+    assert not list(tmp_path.rglob("*.npy"))
+
+    statements = []
+    cache._db.set_trace_callback(statements.append)
+    found, missing = cache.get_many(["text 3", "nope", "text 0", "text 3"])
+    assert missing == [1]
+    assert [found[i][0] for i in (0, 2, 3)] == [3, 0, 3]
+    assert sum(s.startswith("SELECT") for s in statements) == 1
+    assert sum(s.startswith("COMMIT") for s in statements) == 1
+
+    # "text 0" was just used, so it survives eviction; "text 1" does not
+    reopened = EmbeddingCache(str(tmp_path), "m", max_disk_bytes=20 * 1536, memory_items=0)
+    assert reopened.stats["disk_bytes"] == cache.stats["disk_bytes"]
+    for i in range(5, 21):
+        reopened.put(f"text {i}", np.zeros(384, dtype=np.float32))
+    assert reopened.stats["disk_bytes"] <= 20 * 1536
+    assert reopened.get("text 1") is None
+    assert reopened.get("text 0") is not None
+
+def test_put_many_stores_all_misses_in_one_transaction(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "m", memory_items=0)
+    statements = []
+    cache._db.set_trace_callback(statements.append)
+    texts = [f"text {i}" for i in range(10)]
+    cache.put_many(texts, [np.full(8, i, dtype=np.float32) for i in range(10)])
+    assert sum(s.startswith("COMMIT") for s in statements) == 1
+    assert cache.stats["disk_bytes"] == 10 * 8 * 4
+    found, missing = cache.get_many(texts)
+    assert missing == [] and [found[i][0] for i in range(10)] == list(range(10))
+    cache.put_many(texts[:3], [np.zeros(8, dtype=np.float32)] * 3)  # already stored
+    assert cache.stats["disk_bytes"] == 10 * 8 * 4
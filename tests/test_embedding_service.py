@@ -0,0 +1,83 @@
+import threading
+import numpy as np
+import pytest
+from src.embedding_service import EmbeddingBatcher
+
+def _fake_encode(calls):
+    def encode(texts):
+        calls.append(list(texts))
+        return np.array([[len(t), ord(t[0])] for t in texts], dtype=np.float32)
+    return encode
+
+def test_concurrent_requests_share_batches():
+    calls = []
+    batcher = EmbeddingBatcher(_fake_encode(calls), max_batch=64, max_latency_ms=200)
+    start = threading.Barrier(8)
+    results = {}
+
+    def worker(i):
+        texts = [f"text {i}-{j}" for j in range(3)] + ["shared"]
+        start.wait()
+        results[i] = (texts, batcher.encode(texts))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.close()
+    for texts, embeddings in results.values():
+        assert embeddings.tolist() == [[len(t), ord(t[0])] for t in texts]
+    assert len(calls) < 8
+    assert sum(text == "shared" for call in calls for text in call) == len(calls)
+
+def test_batch_flushes_on_size_and_propagates_errors():
+    calls = []
+    batcher = EmbeddingBatcher(_fake_encode(calls), max_batch=2, max_latency_ms=10_000)
+    assert batcher.encode(["ab", "cd"]).shape == (2, 2)  # full batch, no wait
+    batcher.close()
+
+    def broken(texts):
+        raise RuntimeError("model failed")
+
+    batcher = EmbeddingBatcher(broken, max_latency_ms=1)
+    with pytest.raises(RuntimeError):
+        batcher.encode(["x"])
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit(["x"])
+
+def test_cancelled_requests_do_not_stop_the_worker():
+    calls = []
+    batcher = EmbeddingBatcher(_fake_encode(calls), max_batch=64, max_latency_ms=50)
+    cancelled = batcher.submit(["gone"])
+    assert cancelled.cancel()
+    kept = batcher.submit(["kept"])
+    assert kept.result(timeout=2).tolist() == [[4, ord("k")]]
+    assert batcher.encode(["later"]).shape == (1, 2)
+    assert all("gone" not in call for call in calls)
+    batcher.close()
+
+def test_large_request_is_split_so_small_ones_are_not_starved():
+    import time
+
+    calls = []
+    fake = _fake_encode(calls)
+
+    def slow_encode(texts):
+        time.sleep(0.02)
+        return fake(texts)
+
+    batcher = EmbeddingBatcher(slow_encode, max_batch=4, max_latency_ms=1)
+    finished = []
+    large_texts = [f"large {i}" for i in range(40)]
+    large = batcher.submit(large_texts)
+    large.add_done_callback(lambda f: finished.append("large"))
+    time.sleep(0.03)  # the large request is already being encoded
+    small = batcher.submit(["small"])
+    small.add_done_callback(lambda f: finished.append("small"))
+    assert small.result(timeout=5).tolist() == [[5, ord("s")]]
+    assert large.result(timeout=5).tolist() == [[len(t), ord(t[0])] for t in large_texts]
+    batcher.close()
+    assert finished == ["small", "large"]
+    assert max(len(call) for call in calls) <= 4
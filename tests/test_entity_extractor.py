@@ -0,0 +1,155 @@
+import re
+from src.entity_extractor import (
+    TermMatcher,
+    detect_seniority,
+    extract_education_level,
+    extract_experience_years,
+    extract_skills,
+    run_extraction,
+)
+from src.skills_db import SKILL_SYNONYMS
+
+def _naive_labels(text, vocabulary):
+    t = text.lower()
+    return {
+        label
+        for label, terms in vocabulary.items()
+        if any(re.search(rf"\b{re.escape(term)}\b", t) for term in terms)
+    }
+
+def test_extract_skills_whole_words():
+    text = "Python3 developer: Node.js, PySpark, k8s and scikit-learn; no javascripts."
+    assert extract_skills(text) == ["javascript", "kubernetes", "python", "scikit-learn", "spark"]
+
+def test_term_matcher_matches_per_term_search():
+    vocabulary = {
+        "a": ["data", "data science"],
+        "b": ["science"],
+        "c": ["c", "c++", "c#"],
+        "d": ["node.js", "js", ".net"],
+    }
+    matcher = TermMatcher(vocabulary)
+    for text in ["data science", "c++ and c#", "node.js", "asp.net core", "(js) c", "datascience"]:
+        assert matcher.find_labels(text) == _naive_labels(text, vocabulary), text
+
+def test_term_matcher_on_skill_vocabulary():
+    text = "Senior ML engineer: TensorFlow/PyTorch, power bi, AWS S3, Google Cloud BigQuery."
+    assert set(extract_skills(text)) == _naive_labels(text, SKILL_SYNONYMS)
+
+def test_run_extraction_matches_individual_extractors():
+    text = "Senior engineer, 7+ yrs experience. Experience: 9 years in Python. Masters, MBA."
+    ents = run_extraction(text, include_organizations=False, timed=True)
+    assert ents.skills == extract_skills(text)
+    assert ents.experience_years == extract_experience_years(text) == 9
+    assert ents.seniority == detect_seniority(text) == "senior"
+    assert ents.education == extract_education_level(text) == "masters"
+    assert {"normalize", "skills", "experience", "seniority", "education"} <= set(ents.timings)
+
+class _FakeDoc:
+    def __init__(self, text):
+        self.ents = [_FakeEnt(word, "ORG") for word in text.split() if word.istitle()]
+
+class _FakeEnt:
+    def __init__(self, text, label):
+        self.text, self.label_ = text, label
+
+class _FakeNLP:
+    pipe_names = ["tok2vec", "tagger", "parser", "ner"]
+
+    def __init__(self, exclude=()):
+        self.pipe_calls = []
+        self.excluded = list(exclude)
+
+    def pipe(self, texts, n_process=1, batch_size=32):
+        self.pipe_calls.append({"n": len(texts), "n_process": n_process, "batch_size": batch_size})
+        return [_FakeDoc(text) for text in texts]
+
+def _fake_spacy(monkeypatch):
+    import sys
+    import time
+    import types
+    from src import entity_extractor
+
+    loads = []
+    fake = types.ModuleType("spacy")
+    def load(name, exclude=()):
+        time.sleep(0.05)  # wide enough a window for racing first users
+        loads.append(_FakeNLP(exclude))
+        return loads[-1]
+
+    fake.load = load
+    monkeypatch.setitem(sys.modules, "spacy", fake)
+    monkeypatch.setattr(entity_extractor, "_NER_SETTINGS", dict(entity_extractor._NER_SETTINGS))
+    monkeypatch.setattr(entity_extractor, "_NLP", None)
+    monkeypatch.setattr(entity_extractor, "_NLP_LOADED", False)
+    return loads
+
+def test_spacy_is_not_imported_by_default():
+    import subprocess
+    import sys
+
+    code = ("import sys; from src.entity_extractor import run_extraction; "
+            "run_extraction('Python at Acme Corp'); assert 'spacy' not in sys.modules")
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+def test_organizations_use_one_batched_pipe_call(monkeypatch):
+    from src.entity_extractor import configure_ner, extract_organizations, run_extraction_batch
+
+    loads = _fake_spacy(monkeypatch)
+    run_extraction_batch(["Worked at Acme", "Globex"], include_organizations=False)
+    assert loads == []
+    configure_ner(n_process=2, batch_size=7)
+    texts = ["Worked at Acme", "Globex and Initech", "nothing here"]
+    assert extract_organizations(texts) == [["Acme", "Worked"], ["Globex", "Initech"], []]
+    ents = run_extraction_batch(texts, include_organizations=True)
+    assert [e.organizations for e in ents][1] == ["Globex", "Initech"]
+    (nlp,) = loads
+    assert nlp.pipe_calls == [{"n": 3, "n_process": 2, "batch_size": 7}] * 2
+    assert {"tagger", "parser", "lemmatizer"} <= set(nlp.excluded)
+    assert not {"tok2vec", "ner"} & set(nlp.excluded)
+
+def test_concurrent_first_users_load_spacy_once(monkeypatch):
+    import threading
+    from src.entity_extractor import extract_organizations
+
+    loads = _fake_spacy(monkeypatch)
+    start = threading.Barrier(8)
+    results = []
+
+    def worker():
+        start.wait()
+        results.append(extract_organizations(["Worked at Acme"]))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(loads) == 1
+    assert results == [[["Acme", "Worked"]]] * 8
+
+def test_ner_can_be_disabled_from_config(monkeypatch):
+    from src.config import Config
+    from src.entity_extractor import configure_ner_from_config, extract_organizations
+
+    loads = _fake_spacy(monkeypatch)
+    config = Config("config.yml")
+    config.config = config._merge_configs(config.config, {"ner": {"enabled": False}})
+    configure_ner_from_config(config)
+    assert extract_organizations(["Worked at Acme"]) == [[]]
+    assert loads == []
+
+def test_memoized_entities_follow_vocabulary_refresh(monkeypatch):
+    from src.entity_extractor import get_resume_entities, refresh_skill_matcher
+
+    text = "Systems engineer writing Rust"
+    assert get_resume_entities(text).skills == []
+    monkeypatch.setitem(SKILL_SYNONYMS, "rust", ["rust"])
+    refresh_skill_matcher()
+    try:
+        assert extract_skills(text) == ["rust"]
+        assert get_resume_entities(text).skills == ["rust"]
+    finally:
+        monkeypatch.undo()
+        refresh_skill_matcher()
+    assert get_resume_entities(text).skills == []
@@ -0,0 +1,56 @@
+import io
+import threading
+import pytest
+from src import job_queue
+from src.job_queue import QueueFull, ScreeningQueue
+
+def _uploads(n):
+    return [(f"r{i}.txt", io.BytesIO(f"Python, {i} years of experience".encode())) for i in range(n)]
+
+def test_queue_runs_jobs_and_reports_progress(monkeypatch):
+    def fake_screen(resumes, job_description, min_score=None, progress=None):
+        progress("rank", 1, 1)
+        return [dict(r, id=i) for i, r in enumerate(resumes)]
+
+    def fake_extract(stream, filename=None):
+        if filename == "bad.txt":
+            raise ValueError("unreadable")
+        return stream.read().decode()
+
+    monkeypatch.setattr(job_queue, "screen", fake_screen)
+    monkeypatch.setattr(job_queue, "extract_text", fake_extract)
+    queue = ScreeningQueue(workers=1, max_pending=1)
+    uploads = _uploads(5) + [("bad.txt", io.BytesIO(b""))]
+    job = queue.submit(uploads, "Python developer")
+    queue.shutdown()
+    status = queue.get(job.id).to_dict()
+    assert status["status"] == "done" and status["result_count"] == 5
+    assert status["progress"]["extract"] == {"done": 6, "total": 6}
+    assert status["progress"]["rank"] == {"done": 1, "total": 1}
+    assert [e["filename"] for e in status["errors"]] == ["bad.txt"]
+    assert [r["filename"] for r in queue.results_page(job.id, offset=3, limit=10)] == ["r3.txt", "r4.txt"]
+    assert all(stream.closed for _, stream in uploads)
+
+def test_queue_applies_backpressure(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(job_queue, "screen", lambda *a, **k: release.wait(5) and [])
+    queue = ScreeningQueue(workers=1, max_pending=1)
+    first = queue.submit(_uploads(1), "job")
+    queue.submit(_uploads(1), "job")
+    with pytest.raises(QueueFull):
+        queue.submit(_uploads(1), "job")
+    release.set()
+    queue.shutdown()
+    assert queue.get(first.id).status == "done"
+    queue = ScreeningQueue(workers=1, max_pending=0)
+    assert queue.submit(_uploads(1), "job").id
+    queue.shutdown()
+
+def test_failed_submit_does_not_leave_a_queued_job():
+    queue = ScreeningQueue(workers=1, max_pending=0)
+    queue.shutdown()
+    with pytest.raises(RuntimeError):
+        queue.submit(_uploads(1), "job")
+    assert not queue._jobs
+    # The slot was given back too
+    assert queue._slots.acquire(blocking=False)
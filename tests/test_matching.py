@@ -1,4 +1,5 @@
 import os
+import pytest
 from src.resume_processor import load_resumes
 from src.nlp_matcher import match_resumes_to_jobs
 from src.candidate_ranker import rank_candidates
@@ -13,4 +14,145 @@ def test_pipeline_smoke():
     matches = match_resumes_to_jobs(resumes, job_desc)
     ranked = rank_candidates(matches, job_desc)
     assert len(ranked) == len(resumes)
-    assert "final_score" in ranked[0]
\ No newline at end of file
+    assert "final_score" in ranked[0]
+
+def test_top_k_indices_matches_full_sort():
+    import numpy as np
+    from src.nlp_matcher import top_k_indices
+
+    scores = np.random.default_rng(0).random((3, 50))
+    top = top_k_indices(scores, 5)
+    expected = np.argsort(-scores, axis=1)[:, :5]
+    assert top.shape == (3, 5)
+    assert (top == expected).all()
+
+def test_top_k_indices_keeps_earliest_ties():
+    import numpy as np
+    from src.nlp_matcher import top_k_indices
+
+    scores = np.array([[1.0, 3.0, 2.0, 3.0, 2.0, 2.0], [0.0, 0.0, 0.0, 0.0, 0.0, 0.0]])
+    assert top_k_indices(scores, 3).tolist() == [[1, 3, 2], [0, 1, 2]]
+    assert top_k_indices(scores, 10).tolist() == np.argsort(-scores, axis=1, kind="stable").tolist()
+
+def test_stream_directory_matches_full_ranking():
+    from src.streaming import stream_directory
+
+    with open("data/sample_jobs/job1.txt", "r", encoding="utf-8") as f:
+        job_desc = f.read()
+    resumes = load_resumes("data/sample_resumes")
+    expected = rank_candidates(match_resumes_to_jobs(resumes, job_desc), job_desc, top_k=1)
+    assert stream_directory("data/sample_resumes", job_desc, top_k=1, batch_size=1) == expected
+
+class _FakeModel:
+    """Stands in for the SentenceTransformer: few distinct vectors, so many
+    resumes tie on similarity."""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32):
+        import numpy as np
+        self.calls.append(list(texts))
+        return np.array([[1.0, (sum(map(ord, t)) % 3) * 0.5] for t in texts], dtype=np.float32)
+
+def test_stream_top_candidates_matches_full_ranking_with_ties(monkeypatch):
+    import random
+    from src import nlp_matcher
+    from src.streaming import stream_top_candidates
+
+    monkeypatch.setattr(nlp_matcher, "_ensure_model", lambda: _FakeModel())
+    monkeypatch.setattr(nlp_matcher, "_cache", None)
+    pool = [
+        "Senior Python engineer, 6 years, AWS and Docker. Masters.",
+        "Junior analyst, 1 year of Excel.",
+        "Python developer with 3 years of SQL.",
+        "Data scientist, PhD, 4 years of Python and AWS.",
+    ]
+    job = "Python engineer with 3+ years of AWS experience."
+    rng = random.Random(0)
+    for _ in range(100):
+        resumes = [{"filename": f"r{i}.txt", "text": rng.choice(pool)}
+                   for i in range(rng.randint(0, 25))]
+        top_k, batch_size = rng.randint(1, 8), rng.randint(1, 6)
+        min_score = rng.choice([None, 0.0, 50.0])
+        expected = rank_candidates(match_resumes_to_jobs(resumes, job), job,
+                                   top_k=top_k, min_score=min_score)
+        snapshot = [dict(r) for r in resumes]
+        streamed = stream_top_candidates(resumes, job, top_k=top_k,
+                                         min_score=min_score, batch_size=batch_size)
+        assert streamed == expected
+        assert resumes == snapshot  # the caller's dicts are left alone
+    with pytest.raises(ValueError):
+        stream_top_candidates(resumes, job, top_k=None)
+
+def test_stream_directory_many_reads_each_file_once(tmp_path, monkeypatch):
+    from src import nlp_matcher, resume_processor
+    from src.screening import screen_many
+    from src.streaming import stream_directory_many
+
+    model = _FakeModel()
+    monkeypatch.setattr(nlp_matcher, "_ensure_model", lambda: model)
+    monkeypatch.setattr(nlp_matcher, "_cache", None)
+    texts = ["Senior Python engineer, 6 years, AWS.", "Junior analyst with Excel.",
+             "Python developer with SQL.", "Data scientist, PhD, Python and AWS."]
+    for i, text in enumerate(texts):
+        (tmp_path / f"r{i}.txt").write_text(text, encoding="utf-8")
+    jobs = ["Python engineer with AWS.", "SQL analyst.", "Data scientist with a PhD."]
+    extracted = []
+    real_extract = resume_processor.extract_text
+    monkeypatch.setattr(resume_processor, "extract_text",
+                        lambda path, **limits: extracted.append(path) or real_extract(path, **limits))
+
+    streamed = stream_directory_many(str(tmp_path), jobs, top_k=2, batch_size=3)
+    assert len(extracted) == len(texts)
+    # Each resume batch is embedded once, not once per job
+    assert sum(len(call) for call in model.calls) == len(jobs) + len(texts)
+    resumes = [{"filename": f"r{i}.txt", "text": text} for i, text in enumerate(texts)]
+    expected = screen_many(resumes, jobs, top_k=2)
+    assert streamed == [[{k: v for k, v in r.items() if k != "id"} for r in ranked]
+                        for ranked in expected]
+
+def test_stream_directory_forwards_ingestion_options(tmp_path, monkeypatch):
+    from src import nlp_matcher
+    from src.extraction_cache import ExtractionManifest
+    from src.streaming import stream_directory
+
+    monkeypatch.setattr(nlp_matcher, "_ensure_model", lambda: _FakeModel())
+    monkeypatch.setattr(nlp_matcher, "_cache", None)
+    (tmp_path / "a.txt").write_text("Python developer with AWS", encoding="utf-8")
+    manifest = ExtractionManifest(str(tmp_path / "cache" / "manifest.db"))
+    ranked = stream_directory(str(tmp_path), "Python and AWS engineer", top_k=5,
+                              manifest=manifest, max_chars=6)
+    assert [r["matched_skills"] for r in ranked] == [["python"]]
+    assert manifest.lookup(str(tmp_path / "a.txt"), options={"max_chars": 6})["text"] == "Python"
+
+def test_batched_encoding_keeps_input_order(monkeypatch):
+    import math
+    import numpy as np
+    from sklearn.metrics.pairwise import cosine_similarity
+    from src import nlp_matcher
+
+    class DistinctModel(_FakeModel):
+        def encode(self, texts, batch_size=32):
+            self.calls.append(list(texts))
+            return np.array([[len(t), sum(map(ord, t)) % 97, 1.0] for t in texts], dtype=np.float32)
+
+    model = DistinctModel()
+    monkeypatch.setattr(nlp_matcher, "_ensure_model", lambda: model)
+    monkeypatch.setattr(nlp_matcher, "_cache", None)
+    monkeypatch.setattr(nlp_matcher, "_batcher", None)
+    texts = ["x" * (i * 7 % 23 + 1) + str(i) for i in range(50)]
+    job = "Python engineer"
+    resumes = [{"filename": f"{i}.txt", "text": t} for i, t in enumerate(texts)]
+
+    results = match_resumes_to_jobs(resumes, job, batch_size=8)
+    resume_calls = [call for call in model.calls if call != [job]]
+    assert len(resume_calls) == math.ceil(len(texts) / 8)
+    # Each batch holds texts of similar length
+    assert [len(t) for call in resume_calls for t in call] == sorted(map(len, texts))
+
+    # Same scores as encoding each resume on its own, in input order
+    job_emb = model.encode([job])
+    expected = [round(cosine_similarity(job_emb, model.encode([t]))[0, 0] * 100.0, 2) for t in texts]
+    assert [r["filename"] for r in results] == [r["filename"] for r in resumes]
+    assert [r["similarity"] for r in results] == expected
@@ -0,0 +1,252 @@
+import time
+from src import resume_processor
+from src.resume_processor import load_resumes
+
+def test_load_resumes_parallel_matches_serial():
+    serial = load_resumes("data/sample_resumes")
+    assert load_resumes("data/sample_resumes", workers=2) == serial
+    assert [r["filename"] for r in serial] == sorted(r["filename"] for r in serial)
+
+def test_load_resumes_collects_timeouts(monkeypatch):
+    def slow_extract(path, **limits):
+        time.sleep(5)
+        return "never"
+
+    monkeypatch.setattr(resume_processor, "extract_text", slow_extract)
+    errors = []
+    assert load_resumes("data/sample_resumes", timeout=0.05, errors=errors) == []
+    assert errors and all("timed out" in e["error"] for e in errors)
+
+def test_load_resumes_with_manifest_only_extracts_changes(tmp_path, monkeypatch):
+    from src.extraction_cache import ExtractionManifest
+
+    resume_dir = tmp_path / "resumes"
+    resume_dir.mkdir()
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (resume_dir / name).write_text(f"Resume {name}: 3 years of Python", encoding="utf-8")
+    manifest = ExtractionManifest(str(tmp_path / "manifest.db"), with_entities=True)
+    first = load_resumes(str(resume_dir), manifest=manifest)
+    assert len(manifest) == 3
+
+    extracted = []
+    real_extract = resume_processor.extract_text
+    monkeypatch.setattr(resume_processor, "extract_text",
+                        lambda path, **limits: extracted.append(path) or real_extract(path, **limits))
+    (resume_dir / "b.txt").write_text("Changed resume with SQL", encoding="utf-8")
+    (resume_dir / "c.txt").unlink()
+    second = load_resumes(str(resume_dir), manifest=manifest)
+
+    assert [r["filename"] for r in second] == ["a.txt", "b.txt"]
+    assert [p.endswith("b.txt") for p in extracted] == [True]
+    assert second[0] == first[0]
+    assert second[1]["entities"].skills == ["sql"]
+    assert len(manifest) == 2
+
+def test_clean_text_collapses_non_printables():
+    from src.resume_processor import clean_text
+
+    text = "  Jane Doe\r\n• Python\t– AWS\x0c\n\nemail: jane@example.com  "
+    assert clean_text(text) == "Jane Doe Python AWS email: jane@example.com"
+
+def test_extract_text_from_pdf_streams_pages_with_caps(tmp_path, monkeypatch):
+    from src.resume_processor import extract_text_from_pdf, iter_pdf_pages
+
+    class FakePage:
+        def __init__(self, text):
+            self.text = text
+
+        def extract_text(self):
+            return self.text
+
+    class FakeReader:
+        def __init__(self, f):
+            self.pages = [FakePage("one"), FakePage(None), FakePage("three")]
+
+    monkeypatch.setattr(resume_processor.PyPDF2, "PdfReader", FakeReader)
+    pdf = tmp_path / "resume.pdf"
+    pdf.write_bytes(b"%PDF")
+    assert list(iter_pdf_pages(str(pdf))) == ["one", "", "three"]
+    assert extract_text_from_pdf(str(pdf)) == "one\n\nthree\n"
+    assert extract_text_from_pdf(str(pdf), max_pages=1) == "one\n"
+    assert extract_text_from_pdf(str(pdf), max_chars=5) == "one\n\n"
+
+def test_extract_text_from_bytes_and_streams(tmp_path):
+    import io
+    from src.resume_processor import extract_text
+
+    path = tmp_path / "resume.txt"
+    path.write_bytes("Café engineer, 5 years of Python".encode("utf-8"))
+    data = path.read_bytes()
+    expected = extract_text(str(path))
+    assert extract_text(data, filename="resume.txt") == expected
+    assert extract_text(io.BytesIO(data), filename="upload.TXT") == expected
+    assert extract_text("Café".encode("latin-1"), filename="r.txt") == "Café"
+    assert extract_text(data) == ""  # no filename, no format
+
+def test_manifest_entries_go_stale_with_extractor_or_mid_read_edit(tmp_path, monkeypatch):
+    from src import extraction_cache
+    from src.extraction_cache import ExtractionManifest
+
+    resume_dir = tmp_path / "resumes"
+    resume_dir.mkdir()
+    path = resume_dir / "a.txt"
+    path.write_text("Python developer", encoding="utf-8")
+    db = str(tmp_path / "manifest.db")
+
+    # The file changes while it is being extracted: the old text must not
+    # be recorded under the new file's metadata
+    real_extract = resume_processor.extract_text
+
+    def extract_then_edit(p, **limits):
+        text = real_extract(p, **limits)
+        path.write_text("Java developer, edited", encoding="utf-8")
+        return text
+
+    monkeypatch.setattr(resume_processor, "extract_text", extract_then_edit)
+    load_resumes(str(resume_dir), manifest=ExtractionManifest(db, with_entities=True))
+    monkeypatch.setattr(resume_processor, "extract_text", real_extract)
+    manifest = ExtractionManifest(db, with_entities=True)
+    assert manifest.lookup(str(path)) is None
+    assert load_resumes(str(resume_dir), manifest=manifest)[0]["entities"].skills == ["java"]
+    assert manifest.lookup(str(path)) is not None
+
+    # A new extractor version or vocabulary invalidates stored entities
+    monkeypatch.setattr(extraction_cache, "extractor_fingerprint", lambda: "changed")
+    assert ExtractionManifest(db, with_entities=True).lookup(str(path)) is None
+
+def test_manifest_misses_when_extraction_caps_change(tmp_path):
+    from src.extraction_cache import ExtractionManifest
+
+    resume_dir = tmp_path / "resumes"
+    resume_dir.mkdir()
+    (resume_dir / "a.txt").write_text("Python developer with SQL", encoding="utf-8")
+    manifest = ExtractionManifest(str(tmp_path / "manifest.db"))
+    assert load_resumes(str(resume_dir), manifest=manifest, max_chars=6)[0]["text"] == "Python"
+    assert load_resumes(str(resume_dir), manifest=manifest)[0]["text"] == "Python developer with SQL"
+    assert manifest.lookup(str(resume_dir / "a.txt"), options={"max_chars": None}) is not None
+    assert manifest.lookup(str(resume_dir / "a.txt"), options={"max_chars": 6}) is None
+
+def test_timeout_applies_off_the_main_thread(monkeypatch):
+    import threading
+
+    def slow_extract(path, **limits):
+        time.sleep(5)
+        return "never"
+
+    monkeypatch.setattr(resume_processor, "extract_text", slow_extract)
+    errors, result = [], {}
+    thread = threading.Thread(target=lambda: result.setdefault(
+        "resumes", load_resumes("data/sample_resumes", timeout=0.2, errors=errors)))
+    started = time.monotonic()
+    thread.start()
+    thread.join()
+    assert result["resumes"] == []
+    assert errors and all("timed out" in e["error"] for e in errors)
+    assert time.monotonic() - started < 4
+
+def test_crashed_worker_is_a_per_file_error(tmp_path, monkeypatch):
+    import os
+
+    for name in ("a.txt", "b.txt", "crash.txt", "d.txt", "e.txt"):
+        (tmp_path / name).write_text(f"{name} Python", encoding="utf-8")
+    real_extract = resume_processor.extract_text
+
+    def crashing_extract(path, **limits):
+        if path.endswith("crash.txt"):
+            os._exit(1)
+        return real_extract(path, **limits)
+
+    monkeypatch.setattr(resume_processor, "extract_text", crashing_extract)
+    errors = []
+    resumes = load_resumes(str(tmp_path), workers=2, errors=errors)
+    # Only the file that crashed its worker fails; the rest are retried
+    assert [e["filename"] for e in errors] == ["crash.txt"]
+    assert [r["filename"] for r in resumes] == ["a.txt", "b.txt", "d.txt", "e.txt"]
+
+def test_unresponsive_worker_hits_the_parent_backstop(tmp_path, monkeypatch):
+    import signal
+
+    for name in ("stuck1.txt", "stuck2.txt"):  # two files, so they go to the pool
+        (tmp_path / name).write_text("Python", encoding="utf-8")
+
+    def stuck_extract(path, **limits):
+        # Like a parser stuck in C code: the worker's alarm can't interrupt it
+        signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+        time.sleep(3)
+        return "never"
+
+    monkeypatch.setattr(resume_processor, "extract_text", stuck_extract)
+    monkeypatch.setattr(resume_processor, "_TIMEOUT_SLACK", 0.3)
+    errors = []
+    started = time.monotonic()
+    assert load_resumes(str(tmp_path), workers=2, timeout=0.1, errors=errors) == []
+    assert [e["filename"] for e in errors] == ["stuck1.txt", "stuck2.txt"]
+    assert time.monotonic() - started < 2.5
+
+def test_stuck_worker_does_not_hold_up_later_files_or_exit(tmp_path):
+    import subprocess
+    import sys
+    import textwrap
+
+    for name in ("a.txt", "b.txt", "c.txt", "stuck.txt"):
+        (tmp_path / name).write_text(f"{name} Python", encoding="utf-8")
+    script = textwrap.dedent(f"""
+        import signal, time
+        from src import resume_processor
+
+        real_extract = resume_processor.extract_text
+
+        def extract(path, **limits):
+            if path.endswith("stuck.txt"):
+                signal.pthread_sigmask(signal.SIG_BLOCK, {{signal.SIGALRM}})
+                time.sleep(30)
+            return real_extract(path, **limits)
+
+        resume_processor.extract_text = extract
+        resume_processor._TIMEOUT_SLACK = 0.3
+        errors = []
+        resumes = resume_processor.load_resumes({str(tmp_path)!r}, workers=2,
+                                                timeout=0.2, errors=errors)
+        print([r["filename"] for r in resumes], errors)
+    """)
+    started = time.monotonic()
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True,
+                            text=True, timeout=20)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == (
+        "['a.txt', 'b.txt', 'c.txt'] "
+        "[{'filename': 'stuck.txt', 'error': 'timed out after 0.2s'}]")
+    assert time.monotonic() - started < 10
+
+def test_file_deleted_before_lookup_is_a_per_file_error(tmp_path, monkeypatch):
+    from src.extraction_cache import ExtractionManifest
+
+    for name in ("a.txt", "gone.txt"):
+        (tmp_path / name).write_text(f"{name} Python", encoding="utf-8")
+    real_files = resume_processor._resume_files
+
+    def list_then_delete(directory):
+        files = real_files(directory)
+        (tmp_path / "gone.txt").unlink()
+        return files
+
+    monkeypatch.setattr(resume_processor, "_resume_files", list_then_delete)
+    manifest = ExtractionManifest(str(tmp_path / "cache" / "manifest.db"))
+    errors = []
+    resumes = load_resumes(str(tmp_path), manifest=manifest, errors=errors)
+    assert [r["filename"] for r in resumes] == ["a.txt"]
+    assert [e["filename"] for e in errors] == ["gone.txt"]
+
+def test_corrupt_documents_are_errors_not_empty_resumes(tmp_path):
+    (tmp_path / "good.txt").write_text("Python developer", encoding="utf-8")
+    (tmp_path / "broken.pdf").write_bytes(b"%PDF-1.4\n1 0 obj\n<<")
+    (tmp_path / "broken.docx").write_bytes(b"not a zip archive")
+    for workers in (1, 2):
+        errors = []
+        resumes = load_resumes(str(tmp_path), workers=workers, errors=errors)
+        assert [r["filename"] for r in resumes] == ["good.txt"]
+        assert [e["filename"] for e in errors] == ["broken.docx", "broken.pdf"]
+        assert all(e["error"] for e in errors)
+    # The lenient default used for uploads still degrades to ""
+    from src.resume_processor import extract_text
+    assert extract_text(str(tmp_path / "broken.pdf")) == ""
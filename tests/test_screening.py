@@ -0,0 +1,44 @@
+import numpy as np
+from src import screening
+from src.candidate_ranker import rank_candidates
+
+JOBS = [
+    "Senior Python engineer with 5+ years of experience in AWS and Docker.",
+    "Data analyst with SQL and Excel, 2 years of experience.",
+]
+TEXTS = [
+    "Senior engineer, 6 years of experience with Python, AWS, Docker. Masters.",
+    "Junior analyst, 1 year of experience with Excel and SQL.",
+    "Junior analyst, 1 year of experience with Excel and SQL.",  # duplicate text
+    "Data scientist, 3 years of Python and SQL. PhD.",
+]
+
+def _fake_matrix(jobs, texts, batch_size=None, progress=None):
+    return np.random.default_rng(len(texts)).uniform(0, 100, (len(jobs), len(texts)))
+
+def test_screen_many_matches_match_then_rank(monkeypatch):
+    monkeypatch.setattr(screening, "similarity_matrix", _fake_matrix)
+    resumes = [{"filename": f"r{i}.txt", "text": text} for i, text in enumerate(TEXTS)]
+    results = screening.screen_many(resumes, JOBS, min_score=10)
+
+    matrix = _fake_matrix(JOBS, TEXTS)
+    for job, row, ranked in zip(JOBS, matrix, results):
+        matches = [dict(r, id=i, similarity=round(float(s), 2)) for i, (r, s) in enumerate(zip(resumes, row))]
+        assert ranked == rank_candidates(matches, job, min_score=10)
+        # Duplicate texts keep their own ids and similarities
+        by_id = {r["id"]: r for r in ranked}
+        for i in (1, 2):
+            if i in by_id:
+                assert by_id[i]["filename"] == f"r{i}.txt"
+                assert by_id[i]["similarity"] == round(float(row[i]), 2)
+
+def test_screen_keeps_caller_ids(monkeypatch):
+    monkeypatch.setattr(screening, "similarity_matrix", _fake_matrix)
+    ranked = screening.screen([{"id": "x", "text": TEXTS[0]}, TEXTS[1]], JOBS[0], top_k=5)
+    assert {r["id"] for r in ranked} == {"x", 1}
+
+def test_screen_leaves_caller_records_untouched(monkeypatch):
+    monkeypatch.setattr(screening, "similarity_matrix", _fake_matrix)
+    resumes = [{"filename": "a.txt", "text": TEXTS[0]}]
+    screening.screen(resumes, JOBS[0])
+    assert resumes == [{"filename": "a.txt", "text": TEXTS[0]}]